@@ -10,9 +10,15 @@ import os
 import time
 from dagster import asset, Output, AssetExecutionContext
 
+from ..resources.database import get_db_connection, latest_ingestion_epoch
+
 
 # dbt project configuration
 DBT_PROJECT_PATH = "/opt/dagster/dbt"
+# Manifest of the last successful build, saved by the dbt container for state:modified selection
+DBT_STATE_MANIFEST = f"{DBT_PROJECT_PATH}/state/manifest.json"
+# Raw tables the dbt sources read from
+DBT_RAW_SOURCE_TABLES = ["raw_demography_population", "raw_sepe_unemployment", "raw_sepe_contracts"]
 
 
 @asset(
@@ -28,7 +34,8 @@ def dbt_build_all_models(context: AssetExecutionContext) -> Output[dict]:
     communication system with the dbt container to ensure reliable execution.
     
     Execution sequence:
-    1. Creates a trigger file to signal the dbt container
+    1. Creates a trigger file to signal the dbt container (with thread count and
+       selection: state:modified+ when no raw table was reloaded since the last build)
     2. Waits for the dbt container to process the request
     3. Monitors for completion via result file
     4. Returns execution results and status
@@ -47,7 +54,22 @@ def dbt_build_all_models(context: AssetExecutionContext) -> Output[dict]:
     """
     context.log.info("Triggering dbt build process via file system communication")
     
+    config = context.op_config or {}
+    threads = config.get("threads", 8)
+    
     try:
+        # Rebuild only modified models (and their children) when no raw data arrived since the last build
+        selection = "all"
+        if not config.get("full_build", False) and os.path.exists(DBT_STATE_MANIFEST):
+            try:
+                engine = get_db_connection()
+                latest_load = max(latest_ingestion_epoch(engine, table) for table in DBT_RAW_SOURCE_TABLES)
+                if latest_load <= os.stat(DBT_STATE_MANIFEST).st_mtime:
+                    selection = "state:modified+"
+            except Exception as e:
+                context.log.warning(f"Could not compare raw loads with dbt state, running full build: {e}")
+        context.log.info(f"dbt selection: {selection} (threads={threads})")
+        
         # Define file paths for container communication
         trigger_file = f"{DBT_PROJECT_PATH}/run_dbt_build.trigger"
         result_file = f"{DBT_PROJECT_PATH}/dbt_build_result.txt"
@@ -63,6 +85,8 @@ def dbt_build_all_models(context: AssetExecutionContext) -> Output[dict]:
             f.write("requested_by=dagster_pipeline\n")
             f.write("command=dbt_build\n")
             f.write("dependencies_completed=load_demography_to_postgres,validate_codes_data\n")
+            f.write(f"threads={threads}\n")
+            f.write(f"select={selection}\n")
         
         context.log.info(f"Created trigger file: {trigger_file}")
         
@@ -129,12 +153,15 @@ def dbt_build_all_models(context: AssetExecutionContext) -> Output[dict]:
                 "result": result_content,
                 "execution_method": "file_trigger",
                 "build_successful": build_successful,
-                "waited_time_seconds": waited_time
+                "waited_time_seconds": waited_time,
+                "selection": selection
             },
             metadata={
                 "execution_method": "file_trigger",
                 "wait_time_seconds": waited_time,
                 "build_successful": build_successful,
+                "selection": selection,
+                "threads": threads,
                 **metadata
             }
         )
@@ -2,22 +2,35 @@
 Demography data processing assets for municipality analytics pipeline.
 
 Handles the complete ETL process for Spanish municipality population data:
-1. Excel to CSV conversion with smart header detection
+1. Excel to Parquet conversion with smart header detection
 2. PostgreSQL schema creation
 3. Data loading with standardization and validation
 """
 
 import os
-import glob
+import importlib.util
+import itertools
 import pandas as pd
 import requests
 import zipfile
 from pathlib import Path
+from concurrent.futures import ProcessPoolExecutor, as_completed
 from sqlalchemy import text
 from dagster import asset, Output, AssetExecutionContext
 
 from ..utils.data_processing import detect_header_row, clean_dataframe, standardize_demography_columns
-from ..resources.database import get_db_connection, get_data_source_config
+from ..resources.database import (
+    get_db_connection,
+    get_data_source_config,
+    bulk_copy_dataframes,
+    bulk_load_prepare_sql,
+    ensure_schema
+)
+
+# Rows per chunk when streaming clean files into PostgreSQL
+DEMOGRAPHY_CHUNK_ROWS = 50_000
+# Clean file formats, in order of preference when both exist for a year
+DEMOGRAPHY_CLEAN_SUFFIXES = (".parquet", ".csv")
 
 
 @asset(
@@ -44,10 +57,10 @@ def download_ine_demography_zip(context: AssetExecutionContext) -> Output[dict]:
     
     try:
         # Check if files already exist (check for a few key files)
-        existing_files = glob.glob(f"{raw_path}/*.xls*")
+        existing_files = _list_excel_files(raw_path)
         if existing_files:
             context.log.info(f"Files already exist in {raw_path}: {len(existing_files)} files found")
-            extracted_files = [os.path.basename(f) for f in existing_files if f.endswith(('.xls', '.xlsx'))]
+            extracted_files = [os.path.basename(f) for f in existing_files]
             zip_files = extracted_files  # For metadata
         else:
             context.log.info(f"Downloading INE demography ZIP from: {zip_url}")
@@ -106,17 +119,18 @@ def download_ine_demography_zip(context: AssetExecutionContext) -> Output[dict]:
 
 @asset(
     deps=[download_ine_demography_zip],
-    group_name="demography_etl"
+    group_name="demography_etl",
+    op_tags={"municipality/pool": "excel_io"}
 )
 def convert_demography_excel_to_csv(context: AssetExecutionContext) -> Output[dict]:
     """
-    Convert Excel files from raw/ine/demography/ to CSV files in clean/ine/demography/.
+    Convert Excel files from raw/ine/demography/ to Parquet files in clean/ine/demography/.
     
     This asset handles the first stage of the demography ETL pipeline:
     - Detects variable header positions in INE Excel files
     - Standardizes column names across 28 years of data
     - Applies data cleaning and validation
-    - Outputs clean CSV files for further processing
+    - Outputs clean Parquet files (typed, compressed) for further processing
     
     Returns:
         Output containing conversion statistics and file metadata
@@ -127,64 +141,46 @@ def convert_demography_excel_to_csv(context: AssetExecutionContext) -> Output[di
     # Create clean directory if it doesn't exist
     os.makedirs(clean_path, exist_ok=True)
     
-    excel_files = glob.glob(f"{raw_path}/*.xls*")
+    excel_files = _list_excel_files(raw_path)
     context.log.info(f"Found {len(excel_files)} Excel files in {raw_path}")
     context.log.info(f"Files: {[Path(f).name for f in excel_files]}")
     
     converted_files = []
     
-    for file_path in excel_files:
-        filename = Path(file_path).stem
-        
-        # Extract year from filename for column standardization
-        year = _extract_year_from_filename(filename)
-        
-        try:
-            context.log.info(f"Processing {filename} (year {year})")
-            
-            # First, read without specifying header to analyze structure
-            df_raw = pd.read_excel(file_path, header=None)
-            context.log.info(f"Raw Excel shape: {df_raw.shape}")
-            
-            # Detect the actual header row
-            header_row = detect_header_row(df_raw)
-            context.log.info(f"Detected header row: {header_row}")
-            
-            # Re-read with the detected header
-            df = pd.read_excel(file_path, header=header_row)
-            context.log.info(f"After reading with header - shape: {df.shape}")
-            context.log.info(f"Original columns: {list(df.columns)[:10]}")
-            
-            # Clean the dataframe with year info for column standardization
-            df = clean_dataframe(df, year=year)
-            context.log.info(f"After cleaning - shape: {df.shape}")
-            context.log.info(f"Standardized columns: {list(df.columns)[:10]}")
+    # Each year is read and standardized independently, so spread the files over worker processes
+    config = context.op_config or {}
+    max_workers = max(1, min(os.cpu_count() or 1, config.get("max_workers", len(excel_files) or 1)))
+    excel_engine = "calamine" if importlib.util.find_spec("python_calamine") else None
+    context.log.info(f"Converting with {max_workers} worker processes "
+                     f"(Excel engine: {excel_engine or 'pandas default'})")
+    
+    with ProcessPoolExecutor(max_workers=max_workers) as executor:
+        future_to_file = {
+            executor.submit(_convert_demography_file, file_path, clean_path, excel_engine): file_path
+            for file_path in excel_files
+        }
+        for future in as_completed(future_to_file):
+            file_path = future_to_file[future]
+            filename = Path(file_path).stem
+            try:
+                conversion = future.result()
+            except Exception as e:
+                context.log.error(f"Failed to convert {file_path}: {e}")
+                continue
             
             # Additional validation - ensure we have meaningful data
-            if len(df) == 0 or len(df.columns) == 0:
+            if conversion is None:
                 context.log.warning(f"Skipping {filename} - no data after cleaning")
                 continue
-                
-            # Save as CSV
-            csv_path = f"{clean_path}/{filename}.csv"
-            df.to_csv(csv_path, index=False, encoding='utf-8')
-            context.log.info(f"Saved CSV: {csv_path}")
             
-            converted_files.append({
-                "source": filename,
-                "output": f"{filename}.csv",
-                "rows": len(df),
-                "columns": len(df.columns),
-                "header_row_detected": header_row,
-                "year": year,
-                "column_names": list(df.columns)[:5]
-            })
-            
-        except Exception as e:
-            context.log.error(f"Failed to convert {file_path}: {e}")
-            import traceback
-            context.log.error(f"Traceback: {traceback.format_exc()}")
-            continue
+            context.log.info(
+                f"Saved Parquet: {clean_path}/{conversion['output']} "
+                f"({conversion['rows']:,} rows, header row {conversion['header_row_detected']}, "
+                f"year {conversion['year']})"
+            )
+            converted_files.append(conversion)
+    
+    converted_files.sort(key=lambda conversion: conversion["year"])
     
     return Output(
         {"converted_files": converted_files},
@@ -216,11 +212,11 @@ def create_raw_schema(context: AssetExecutionContext) -> Output[str]:
         engine = get_db_connection()
         context.log.info("Database connection established for schema creation")
         
-        with engine.connect() as conn:
-            # Create raw schema
-            result = conn.execute(text("CREATE SCHEMA IF NOT EXISTS raw;"))
-            conn.commit()
+        # Create raw schema (skipped if this process already ensured it)
+        if ensure_schema(engine, "raw"):
             context.log.info("Raw schema created successfully")
+        else:
+            context.log.info("Raw schema already ensured in this process")
             
         return Output(
             "raw",
@@ -235,14 +231,15 @@ def create_raw_schema(context: AssetExecutionContext) -> Output[str]:
 
 @asset(
     deps=[create_raw_schema, convert_demography_excel_to_csv],
-    group_name="demography_etl"
+    group_name="demography_etl",
+    op_tags={"municipality/pool": "postgres_write"}
 )
 def load_demography_to_postgres(context: AssetExecutionContext) -> Output[dict]:
     """
-    Load CSV files from clean/ine/demography/ into PostgreSQL raw schema.
+    Load clean Parquet files from clean/ine/demography/ into PostgreSQL raw schema.
     
     This asset performs the final stage of demography ETL:
-    - Reads all cleaned CSV files
+    - Reads all cleaned Parquet files (CSV from older runs is still accepted)
     - Applies final standardization across all years
     - Adds data lineage metadata
     - Loads into a single PostgreSQL table with proper handling of existing data
@@ -251,15 +248,15 @@ def load_demography_to_postgres(context: AssetExecutionContext) -> Output[dict]:
         Output containing loading statistics and metadata
     """
     clean_path = "/opt/dagster/clean/ine/demography"
-    csv_files = glob.glob(f"{clean_path}/*.csv")
-    context.log.info(f"Found {len(csv_files)} CSV files in {clean_path}")
-    context.log.info(f"CSV files: {[Path(f).name for f in csv_files]}")
+    clean_files = _list_clean_demography_files(clean_path)
+    context.log.info(f"Found {len(clean_files)} clean files in {clean_path}")
+    context.log.info(f"Clean files: {[Path(f).name for f in clean_files]}")
     
-    if len(csv_files) == 0:
-        context.log.warning("No CSV files found! Check if Excel to CSV conversion worked.")
+    if len(clean_files) == 0:
+        context.log.warning("No clean files found! Check if Excel conversion worked.")
         return Output(
             {"loaded_tables": []},
-            metadata={"error": "No CSV files found to load"}
+            metadata={"error": "No clean files found to load"}
         )
     
     engine = get_db_connection()
@@ -271,9 +268,10 @@ def load_demography_to_postgres(context: AssetExecutionContext) -> Output[dict]:
     
     # Get source config once (not per row)
     source_config = get_data_source_config('demography')
+    unlogged = source_config.unlogged_raw_table
     ingestion_timestamp = pd.Timestamp.now()
     
-    context.log.info("Processing CSV files with batch loading")
+    context.log.info("Processing clean files with COPY bulk loading")
     
     # First, check if table exists and truncate if needed
     with engine.connect() as conn:
@@ -290,72 +288,57 @@ def load_demography_to_postgres(context: AssetExecutionContext) -> Output[dict]:
             context.log.info("Table exists, truncating data to preserve dependent views")
             truncate_query = text("TRUNCATE TABLE raw.raw_demography_population")
             conn.execute(truncate_query)
+            conn.execute(text(bulk_load_prepare_sql(table_name, unlogged=unlogged)))
             conn.commit()
     
     # Process files with fresh connections to avoid transaction issues
     first_file = True
-    for csv_file in csv_files:
-        filename = Path(csv_file).stem
+    for clean_file in clean_files:
+        filename = Path(clean_file).stem
         year = _extract_year_from_filename(filename)
         
         try:
             context.log.info(f"Processing {filename} (year {year})")
             
-            # Read and process CSV
-            df = pd.read_csv(csv_file)
+            # Read and process the file in chunks so it is never fully held in memory
+            chunks = (
+                _prepare_demography_chunk(chunk, year, filename, source_config, ingestion_timestamp)
+                for chunk in _read_clean_chunks(clean_file)
+            )
+            first_chunk = next(chunks, None)
             
-            if len(df) == 0:
-                context.log.warning(f"Skipping {filename} - empty CSV file")
+            if first_chunk is None or len(first_chunk) == 0:
+                context.log.warning(f"Skipping {filename} - empty file")
                 continue
-                
-            # Apply standardized column names
-            df = standardize_demography_columns(df, year)
-            
-            # Add metadata columns efficiently
-            df = df.assign(
-                data_year=year,
-                source_file=filename,
-                data_source=source_config['source_name'],
-                data_source_full=source_config['source_full_name'],
-                data_category=source_config['category'],
-                source_url=source_config['url'],
-                source_description=source_config['description'],
-                ingestion_timestamp=ingestion_timestamp
-            )
             
-            # Load to PostgreSQL with fresh connection
+            # Load to PostgreSQL with COPY FROM STDIN
             if first_file and not table_exists:
-                # Create new table
-                df.to_sql(
+                # Create the empty table from the first chunk's schema, then copy the rows in
+                first_chunk.head(0).to_sql(
                     name=table_name,
                     con=engine,
                     schema='raw',
                     if_exists='replace',
-                    index=False,
-                    method='multi',
-                    chunksize=5000
+                    index=False
                 )
-                context.log.info(f"Created new table with {len(df):,} rows from {filename}")
-                first_file = False
+                with engine.connect() as conn:
+                    conn.execute(text(bulk_load_prepare_sql(table_name, unlogged=unlogged)))
+                    conn.commit()
+            
+            rows_loaded = bulk_copy_dataframes(
+                engine, itertools.chain([first_chunk], chunks), table_name, synchronous_commit=False
+            )
+            if first_file and not table_exists:
+                context.log.info(f"Created new table with {rows_loaded:,} rows from {filename}")
             else:
-                # Append to existing table
-                df.to_sql(
-                    name=table_name,
-                    con=engine,
-                    schema='raw',
-                    if_exists='append',
-                    index=False,
-                    method='multi',
-                    chunksize=5000
-                )
-                context.log.info(f"Appended {len(df):,} rows from {filename}")
-                first_file = False
+                context.log.info(f"Appended {rows_loaded:,} rows from {filename}")
+            first_file = False
             
             loaded_tables.append({
                 "source_file": filename,
                 "year": year,
-                "rows_loaded": len(df),
-                "columns": list(df.columns),
+                "rows_loaded": rows_loaded,
+                "columns": list(first_chunk.columns),
             })
             
         except Exception as e:
@@ -373,6 +356,11 @@ def load_demography_to_postgres(context: AssetExecutionContext) -> Output[dict]:
     
     total_rows = sum(table["rows_loaded"] for table in loaded_tables)
     context.log.info(f"Successfully loaded {total_rows:,} total rows to PostgreSQL")
+    
+    # Autovacuum is off for the raw table, so refresh planner statistics explicitly
+    with engine.connect() as conn:
+        conn.execute(text(f"ANALYZE raw.{table_name}"))
+        conn.commit()
         
     return Output(
         {"loaded_tables": loaded_tables},
@@ -386,6 +374,129 @@ def load_demography_to_postgres(context: AssetExecutionContext) -> Output[dict]:
     )
 
 
+def _prepare_demography_chunk(df: pd.DataFrame, year: int, filename: str,
+                              source_config, ingestion_timestamp) -> pd.DataFrame:
+    """
+    Standardize one chunk of a clean demography file and add the load metadata columns.
+    
+    Args:
+        df: Chunk read from the clean file
+        year: Data year of the file
+        filename: Source file stem
+        source_config: DataSourceConfig for the demography source
+        ingestion_timestamp: Timestamp shared by every row of this load
+        
+    Returns:
+        Chunk ready to be copied into raw.raw_demography_population
+    """
+    # Apply standardized column names (memoized per header, so cheap per chunk)
+    df = standardize_demography_columns(df, year)
+    
+    # Add metadata columns efficiently
+    df = df.assign(
+        data_year=year,
+        source_file=filename,
+        data_source=source_config.source_name,
+        data_source_full=source_config.source_full_name,
+        data_category=source_config.category,
+        source_url=source_config.url,
+        source_description=source_config.description,
+        ingestion_timestamp=ingestion_timestamp
+    )
+    
+    # Population counts are whole numbers; nullable ints keep them valid for BIGINT columns in COPY
+    population_columns = [col for col in df.columns if col.startswith('population')]
+    if population_columns:
+        df[population_columns] = df[population_columns].round().astype('Int64')
+    
+    return df
+
+
+def _convert_demography_file(file_path: str, clean_path: str, excel_engine: str = None) -> dict:
+    """
+    Convert one INE demography Excel file to a clean Parquet file (runs in a worker process).
+    
+    Args:
+        file_path: Path to the source .xls/.xlsx file
+        clean_path: Directory to write the Parquet file into
+        excel_engine: pandas Excel engine, or None for the pandas default
+        
+    Returns:
+        Conversion metadata, or None if nothing is left after cleaning
+    """
+    filename = Path(file_path).stem
+    
+    # Extract year from filename for column standardization
+    year = _extract_year_from_filename(filename)
+    
+    # First, read without specifying header to analyze structure
+    df_raw = pd.read_excel(file_path, header=None, engine=excel_engine)
+    
+    # Detect the actual header row
+    header_row = detect_header_row(df_raw)
+    
+    # Re-read with the detected header, keeping strings and numbers in Arrow-backed columns
+    df = pd.read_excel(file_path, header=header_row, engine=excel_engine)
+    df = df.convert_dtypes(dtype_backend="pyarrow")
+    
+    # Clean the dataframe with year info for column standardization
+    df = clean_dataframe(df, year=year)
+    
+    if len(df) == 0 or len(df.columns) == 0:
+        return None
+    
+    # Save as Parquet: keeps dtypes and avoids re-parsing text on load
+    df.to_parquet(f"{clean_path}/{filename}.parquet", engine="pyarrow", compression="zstd", index=False)
+    
+    return {
+        "source": filename,
+        "output": f"{filename}.parquet",
+        "rows": len(df),
+        "columns": len(df.columns),
+        "header_row_detected": header_row,
+        "year": year,
+        "column_names": list(df.columns)[:5]
+    }
+
+
+def _list_clean_demography_files(clean_path: str) -> list:
+    """
+    List clean demography files with one os.scandir pass, one file per year.
+    
+    Parquet is preferred; a CSV is used only when no Parquet file exists for
+    the same stem (clean directories written by older runs).
+    
+    Args:
+        clean_path: Directory holding the clean files
+        
+    Returns:
+        Sorted paths of the files to load
+    """
+    if not os.path.isdir(clean_path):
+        return []
+    by_stem = {}
+    with os.scandir(clean_path) as entries:
+        for entry in entries:
+            stem, suffix = os.path.splitext(entry.name)
+            if suffix not in DEMOGRAPHY_CLEAN_SUFFIXES or not entry.is_file():
+                continue
+            current = by_stem.get(stem)
+            if current is None or (DEMOGRAPHY_CLEAN_SUFFIXES.index(suffix)
+                                   < DEMOGRAPHY_CLEAN_SUFFIXES.index(os.path.splitext(current)[1])):
+                by_stem[stem] = entry.path
+    return sorted(by_stem.values())
+
+
+def _read_clean_chunks(path: str):
+    """Yield DataFrame chunks of DEMOGRAPHY_CHUNK_ROWS rows from a clean Parquet or CSV file."""
+    if path.endswith(".parquet"):
+        import pyarrow.parquet as pq
+        for batch in pq.ParquetFile(path).iter_batches(batch_size=DEMOGRAPHY_CHUNK_ROWS):
+            yield batch.to_pandas()
+    else:
+        yield from pd.read_csv(path, chunksize=DEMOGRAPHY_CHUNK_ROWS)
+
+
 def _extract_year_from_filename(filename: str) -> int:
     """
     Extract year from INE filename format (e.g., pobmun24 -> 2024).
@@ -402,4 +513,21 @@ def _extract_year_from_filename(filename: str) -> int:
         # Convert 2-digit year to 4-digit (96-99 = 1996-1999, 00-24 = 2000-2024)
         return 1900 + year_int if year_int >= 96 else 2000 + year_int
     else:
-        return int(year_str)
\ No newline at end of file
+        return int(year_str)
+
+
+def _list_excel_files(directory: str) -> list:
+    """
+    List .xls/.xlsx files in a directory with a single os.scandir pass.
+    
+    Args:
+        directory: Directory to scan
+        
+    Returns:
+        Paths of the Excel files found (empty if the directory doesn't exist)
+    """
+    if not os.path.isdir(directory):
+        return []
+    with os.scandir(directory) as entries:
+        return [entry.path for entry in entries
+                if entry.name.endswith(('.xls', '.xlsx')) and entry.is_file()]
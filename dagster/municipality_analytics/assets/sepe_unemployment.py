@@ -4,23 +4,228 @@ Dagster assets for extracting raw SEPE unemployment XLS files and loading to Pos
 """
 
 import os
-import pandas as pd
-import glob
+import io
+import asyncio
+import hashlib
+import json
 from pathlib import Path
-from sqlalchemy import text
-from dagster import asset, AssetExecutionContext, get_dagster_logger, Output
-from typing import List, Dict
+from dagster import asset, AssetExecutionContext, get_dagster_logger, Output, DataVersion
+from typing import List, Dict, Optional, Set, TYPE_CHECKING
+
+from ..utils.manifest import (
+    SEPE_LISTING_VALIDATORS_FILENAME,
+    load_json,
+    load_sepe_manifest,
+    write_json_atomic,
+    write_sepe_manifest
+)
+from .demography import create_raw_schema
+from ..resources.database import (
+    get_db_connection,
+    get_data_source_config,
+    bulk_load_prepare_sql
+)
+
+# pyarrow and the SEPE scraper/cleaner (which pull in pandas) are imported where
+# they are used, so building the Dagster definitions doesn't pay for them
+if TYPE_CHECKING:
+    import pyarrow as pa
+
+
+def _scan_xls_entries(directory: str) -> list:
+    """Regular .xls/.xlsx files in a directory as os.DirEntry objects, without following symlinks"""
+    if not os.path.isdir(directory):
+        return []
+    with os.scandir(directory) as entries:
+        return [entry for entry in entries
+                if entry.name.endswith(('.xls', '.xlsx')) and entry.is_file(follow_symlinks=False)]
+
+
+def _clean_files(clean_path: str, data_category: str) -> List[str]:
+    """Consolidated files for a data category, preferring Parquet over legacy CSV output"""
+    parquet_files, csv_files = [], []
+    if os.path.isdir(clean_path):
+        with os.scandir(clean_path) as entries:
+            for entry in entries:
+                if entry.name.endswith(f"_{data_category}.parquet"):
+                    parquet_files.append(entry.path)
+                elif entry.name.endswith(f"_{data_category}.csv"):
+                    csv_files.append(entry.path)
+    return sorted(parquet_files or csv_files)
+
+
+def _read_clean_file(file_path: str) -> "pa.Table":
+    """Read a consolidated Parquet or CSV file as an Arrow table (Parquet carries its own types)"""
+    import pyarrow as pa
+    if file_path.endswith('.parquet'):
+        import pyarrow.parquet as pq
+        table = pq.read_table(file_path)
+        # Category columns come back dictionary-encoded; COPY needs their plain values
+        return table.cast(pa.schema([
+            pa.field(field.name, field.type.value_type if pa.types.is_dictionary(field.type) else field.type)
+            for field in table.schema
+        ]))
+    import pyarrow.csv as pv
+    
+    # Known non-count columns are typed up front instead of inferred
+    column_types = {
+        'municipality_name': pa.string(),
+        'province': pa.string(),
+        'year': pa.int16(),
+        'month': pa.int8(),
+        'data_type': pa.string()
+    }
+    return pv.read_csv(
+        file_path,
+        read_options=pv.ReadOptions(block_size=8 << 20, use_threads=True),
+        convert_options=pv.ConvertOptions(column_types=column_types)
+    )
+
+
+def _files_signature(file_paths: List[str]) -> str:
+    """Hash of path, size and mtime for each file - changes whenever the file set changes"""
+    sig = hashlib.blake2b(digest_size=16)
+    for file_path in sorted(file_paths):
+        st = os.stat(file_path)
+        sig.update(file_path.encode())
+        sig.update(st.st_size.to_bytes(8, 'little'))
+        sig.update(st.st_mtime_ns.to_bytes(8, 'little'))
+    return sig.hexdigest()
+
+
+# Data columns of the consolidated SEPE files; OLD format files carry a subset
+SEPE_DATA_COLUMNS = {
+    'unemployment': [
+        'total_unemployment', 'men_under_25', 'men_25_44', 'men_45_plus',
+        'women_under_25', 'women_25_44', 'women_45_plus',
+        'agriculture_sector', 'industry_sector', 'construction_sector',
+        'services_sector', 'no_previous_employment'
+    ],
+    'contracts': [
+        'total_contracts', 'men_indefinite_initial', 'men_temporary_initial',
+        'men_indefinite_conversion', 'women_indefinite_initial',
+        'women_temporary_initial', 'women_indefinite_conversion',
+        'agriculture_sector', 'industry_sector', 'construction_sector',
+        'services_sector'
+    ]
+}
+
+
+def _sepe_table_ddl(table_name: str, data_category: str) -> str:
+    """
+    CREATE TABLE IF NOT EXISTS statement for a SEPE raw table.
+    
+    The load-constant metadata columns are server-side DEFAULTs, so COPY only
+    sends the data columns and source_file.
+    """
+    count_columns = ',\n'.join(f"            {column} double precision" 
+                                for column in SEPE_DATA_COLUMNS[data_category])
+    return f"""
+        CREATE TABLE IF NOT EXISTS raw.{table_name} (
+            municipality_code bigint,
+            municipality_name text,
+{count_columns},
+            province text,
+            year integer,
+            month integer,
+            data_type text,
+            source_file text,
+            data_source text NOT NULL DEFAULT 'SEPE',
+            data_source_full text NOT NULL DEFAULT 'Servicio Público de Empleo Estatal',
+            data_category text NOT NULL DEFAULT '{data_category}',
+            ingestion_timestamp timestamptz NOT NULL DEFAULT now()
+        )
+    """
+
+
+# Consolidated files ({name: mtime_ns}) read by the last complete load of each SEPE raw table
+SEPE_LOAD_STATE_DDL = """
+    CREATE TABLE IF NOT EXISTS raw.sepe_load_state (
+        table_name text PRIMARY KEY,
+        files jsonb NOT NULL,
+        loaded_at timestamptz NOT NULL DEFAULT now()
+    )
+"""
+
+
+def _clean_file_state(category_files: List[str]) -> Dict[str, int]:
+    """{file name: mtime_ns} of the consolidated files a load would read"""
+    return {Path(clean_file).name: os.stat(clean_file).st_mtime_ns for clean_file in category_files}
+
+
+def _recorded_load_state(engine, table_name: str) -> Optional[Dict[str, int]]:
+    """File state recorded by the last complete load of raw.<table_name>, or None if there is none"""
+    raw_conn = engine.raw_connection()
+    try:
+        with raw_conn.cursor() as cur:
+            cur.execute(
+                "SELECT to_regclass('raw.sepe_load_state') IS NOT NULL AND to_regclass(%s) IS NOT NULL",
+                (f"raw.{table_name}",)
+            )
+            if not cur.fetchone()[0]:
+                return None
+            cur.execute("SELECT files FROM raw.sepe_load_state WHERE table_name = %s", (table_name,))
+            row = cur.fetchone()
+            return row[0] if row else None
+    finally:
+        raw_conn.close()
+
+
+def _sepe_defaults_ddl(table_name: str, data_category: str) -> str:
+    """Add the metadata DEFAULTs to a SEPE raw table created before they existed"""
+    return f"""
+        ALTER TABLE raw.{table_name}
+            ALTER COLUMN data_source SET DEFAULT 'SEPE',
+            ALTER COLUMN data_source_full SET DEFAULT 'Servicio Público de Empleo Estatal',
+            ALTER COLUMN data_category SET DEFAULT '{data_category}',
+            ALTER COLUMN ingestion_timestamp SET DEFAULT now()
+    """
+
+
+def _with_source_file(table: "pa.Table", filename: str) -> "pa.Table":
+    """Append the row lineage column, broadcast natively with pa.repeat"""
+    import pyarrow as pa
+    return table.append_column(
+        'source_file', pa.repeat(pa.scalar(filename, type=pa.string()), table.num_rows)
+    )
+
+
+def _copy_arrow_table(cur, table: "pa.Table", qualified_table_name: str) -> None:
+    """
+    Bulk load an Arrow table into an existing PostgreSQL table with COPY FROM STDIN.
+    
+    The table is serialized to CSV by Arrow's writer and streamed through the
+    given psycopg2 cursor; committing is left to the caller.
+    """
+    import pyarrow.csv as pv
+    
+    buffer = io.BytesIO()
+    pv.write_csv(table, buffer)
+    buffer.seek(0)
+    
+    columns = ', '.join(f'"{column}"' for column in table.column_names)
+    cur.copy_expert(
+        f"COPY {qualified_table_name} ({columns}) FROM STDIN WITH (FORMAT CSV, HEADER)",
+        buffer
+    )
 
-from ..utils.sepe_scraper import SepeScraper
-from ..utils.sepe_data_cleaner import SepeDataCleaner
-from ..resources.database import get_db_connection
+
+def _run_async(coro):
+    """Run a coroutine to completion, using uvloop's event loop when it is installed."""
+    try:
+        import uvloop
+        asyncio.set_event_loop_policy(uvloop.EventLoopPolicy())
+    except ImportError:
+        pass
+    return asyncio.run(coro)
 
 
 @asset(
     description="Extract raw XLS files from SEPE website",
-    group_name="sepe_etl"
+    group_name="sepe_etl",
+    op_tags={"municipality/pool": "http_scrape"}
 )
-def sepe_raw_xls_files(context: AssetExecutionContext) -> List[str]:
+def sepe_raw_xls_files(context: AssetExecutionContext) -> Output[List[str]]:
     """
     Extract raw unemployment XLS files from SEPE website
     Downloads the "Libro completo" files without processing them
@@ -29,40 +234,47 @@ def sepe_raw_xls_files(context: AssetExecutionContext) -> List[str]:
     
     download_dir = "/opt/dagster/raw/sepe"
     
-    # Check if files already exist
-    import glob
-    existing_files = glob.glob(f"{download_dir}/*.xls*")
-    
-    if existing_files:
-        logger.info(f"SEPE files already exist: {len(existing_files)} files found")
-        downloaded_files = existing_files
+    # Check if files already exist (stops at the first match instead of listing the directory)
+    has_existing_files = False
+    if os.path.isdir(download_dir):
+        with os.scandir(download_dir) as entries:
+            has_existing_files = any(entry.name.endswith(('.xls', '.xlsx')) and entry.is_file(follow_symlinks=False)
+                                     for entry in entries)
+
+    from ..utils.sepe_scraper import SepeScraper
+    
+    # Skip the scrape only when the SEPE listing page is unchanged since the last run
+    scraper = SepeScraper(download_dir=download_dir)
+    validators_path = Path(download_dir) / SEPE_LISTING_VALIDATORS_FILENAME
+    listing_validators = scraper.get_listing_validators()
+    listing_unchanged = (not listing_validators 
+                         or listing_validators == load_json(validators_path))
+
+    if has_existing_files and listing_unchanged:
+        # A directory listing can't contain duplicates, so only sort for a stable order
+        downloaded_files = sorted(entry.path for entry in _scan_xls_entries(download_dir))
+        logger.info(f"SEPE files already exist and listing is unchanged: {len(downloaded_files)} files found")
     else:
-        # Initialize scraper with mapped volume path
-        scraper = SepeScraper(download_dir=download_dir)
-        
-        # Get the latest available data first
-        logger.info("Attempting to download latest SEPE unemployment XLS file")
-        latest_file = scraper.get_latest_data()
-        
-        downloaded_files = []
-        if latest_file:
-            downloaded_files.append(latest_file)
-            logger.info(f"Downloaded latest file: {latest_file}")
-        
-        # Download all available historical data
+        # Download all available data concurrently, latest month included (existing files are skipped)
         logger.info("Downloading all available XLS files from SEPE")
-        historical_files = scraper.scrape_all_available_data(
+        # Two month links can resolve to the same YEAR_MONTH file, so collect into a set
+        downloaded: Set[str] = set(_run_async(scraper.scrape_all_available_data_async(
             years=None,  # Download all available years
-            max_files=None  # No limit on files
-        )
+            max_files=None,  # No limit on files
+            concurrency=16  # Bounded so the SEPE server isn't overwhelmed
+        )))
+        downloaded_files = sorted(downloaded)
         
-        downloaded_files.extend(historical_files)
-    
-    # Remove duplicates
-    downloaded_files = list(set(downloaded_files))
+        if listing_validators:
+            write_json_atomic(validators_path, listing_validators)
     
     logger.info(f"Total XLS files downloaded: {len(downloaded_files)}")
-    return downloaded_files
+    
+    # Version the output by file content signature so unchanged inputs can be skipped downstream
+    return Output(
+        downloaded_files,
+        data_version=DataVersion(_files_signature(downloaded_files))
+    )
 
 
 @asset(
@@ -76,42 +288,39 @@ def sepe_files_inventory(context: AssetExecutionContext) -> dict:
     """
     logger = get_dagster_logger()
     
-    import glob
-    
-    # Get all SEPE files from mapped volume path
-    xls_files = glob.glob("/opt/dagster/raw/sepe/*.xls") + glob.glob("/opt/dagster/raw/sepe/*.xlsx")
+    # Get all SEPE files from mapped volume path in a single directory scan
+    xls_entries = _scan_xls_entries("/opt/dagster/raw/sepe")
     
+    # Preallocated list of compact tuples (one stat per file, integer MB via shift)
+    files = [None] * len(xls_entries)
+    for i, entry in enumerate(xls_entries):
+        st = entry.stat(follow_symlinks=False)
+        files[i] = (entry.name, entry.path, st.st_size >> 20, st.st_mtime)
+
     inventory = {
-        'total_files': len(xls_files),
-        'files': []
+        'total_files': len(xls_entries),
+        'file_fields': ('filename', 'file_path', 'size_mb', 'modified_date'),
+        'files': files
     }
-    
-    for file_path in xls_files:
-        file_info = {
-            'filename': os.path.basename(file_path),
-            'file_path': file_path,
-            'size_mb': round(os.path.getsize(file_path) / (1024 * 1024), 2),
-            'modified_date': os.path.getmtime(file_path)
-        }
-        inventory['files'].append(file_info)
-    
+
     logger.info(f"SEPE files inventory: {inventory['total_files']} files found")
     return inventory
 
 
 @asset(
-    description="Clean SEPE XLS files and convert to organized CSV files",
+    description="Clean SEPE XLS files and convert to organized Parquet files",
     group_name="sepe_etl",
-    deps=[sepe_raw_xls_files]
+    deps=[sepe_raw_xls_files],
+    op_tags={"municipality/pool": "excel_io"}
 )
 def sepe_clean_data(context: AssetExecutionContext) -> Output[Dict]:
     """
-    Clean and process SEPE XLS files into organized CSV files
+    Clean and process SEPE XLS files into organized Parquet files
     
-    This asset processes all SEPE XLS files and creates separate CSV files
-    for each province and date combination:
-    - unemployment/[PROVINCE]_[YEAR]_[MONTH]_unemployment.csv
-    - contracts/[PROVINCE]_[YEAR]_[MONTH]_contracts.csv
+    This asset processes all SEPE XLS files and creates one consolidated
+    file per month and data type (CSV when output_format is "csv"):
+    - [YEAR]_[MONTH]_unemployment.parquet
+    - [YEAR]_[MONTH]_contracts.parquet
     
     Returns:
         Output containing processing statistics and file paths
@@ -121,48 +330,56 @@ def sepe_clean_data(context: AssetExecutionContext) -> Output[Dict]:
     # Check for force reprocess configuration and performance settings
     config = context.op_config or {}
     force_reprocess = config.get("force_reprocess", False)
-    max_workers = config.get("max_workers", 4)  # Allow configurable parallelism
+    # Worker processes, leaving one core free for the Dagster process itself
+    max_workers = max(1, min((os.cpu_count() or 2) - 1, config.get("max_workers", 4)))
+    excel_engine = config.get("excel_engine", "calamine")
+    output_format = config.get("output_format", "parquet")  # "csv" for tools that need text files
+    
+    from ..utils.sepe_data_cleaner import SepeDataCleaner
     
     # Initialize the optimized data cleaner
     cleaner = SepeDataCleaner(
         input_dir="/opt/dagster/raw/sepe",
         output_dir="/opt/dagster/clean/sepe",
         force_reprocess=force_reprocess,
-        max_workers=max_workers
+        max_workers=max_workers,
+        excel_engine=excel_engine,
+        output_format=output_format
     )
     
     logger.info(f"Starting optimized SEPE processing:")
     logger.info(f"  Force reprocess: {force_reprocess}")
-    logger.info(f"  Max workers: {max_workers}")
+    logger.info(f"  Max worker processes: {max_workers}")
+    logger.info(f"  Excel engine: {cleaner.excel_engine or 'openpyxl/xlrd fallback'}")
+    logger.info(f"  Output format: {output_format}")
     logger.info(f"  Processing mode: {'Overwrite existing files' if force_reprocess else 'Skip existing files'}")
     
-    logger.info("Starting SEPE data cleaning and CSV generation")
+    logger.info(f"Starting SEPE data cleaning and {output_format} generation")
     
     try:
-        # Process all files and create organized CSV files
+        # Process all files and create organized consolidated files
         saved_files = cleaner.clean_all_files()
-        
+
+        # Record file coverage so the summary asset doesn't rescan every file
+        try:
+            manifest = write_sepe_manifest(cleaner.output_dir)
+            logger.info(f"SEPE manifest written with {len(manifest['files'])} entries")
+        except Exception as e:
+            logger.warning(f"Failed to write SEPE manifest: {e}")
+
         # Calculate statistics
         total_files = sum(len(files) for files in saved_files.values())
         
-        # Calculate statistics
-        xls_files = list(cleaner.input_dir.glob("*.xls"))
-        
-        # Count how many files were actually processed vs skipped
-        processed_count = 0
-        skipped_count = 0
-        
-        for file_path in xls_files:
-            if not force_reprocess and cleaner.check_file_already_processed(file_path):
-                skipped_count += 1
-            else:
-                processed_count += 1
+        # Processed vs skipped counts recorded by the cleaner's single directory scan
+        total_xls_files = cleaner.processing_stats['xls_files_found']
+        skipped_count = cleaner.processing_stats['files_skipped']
+        processed_count = total_xls_files - skipped_count
         
         # Enhanced summary statistics with performance metrics
-        processing_rate = processed_count / max(1, len(xls_files)) * 100
+        processing_rate = processed_count / max(1, total_xls_files) * 100
         
         summary = {
-            'total_xls_files': len(xls_files),
+            'total_xls_files': total_xls_files,
             'files_processed': processed_count,
             'files_skipped': skipped_count,
             'processing_rate_percent': round(processing_rate, 1),
@@ -170,13 +387,13 @@ def sepe_clean_data(context: AssetExecutionContext) -> Output[Dict]:
             'unemployment_files': len(saved_files.get('unemployment', [])),
             'contracts_files': len(saved_files.get('contracts', [])),
             'output_directory': str(cleaner.output_dir),
-            'file_organization': 'Consolidated monthly files: [YEAR]_[MONTH]_[DATA_TYPE].csv',
+            'file_organization': f'Consolidated monthly files: [YEAR]_[MONTH]_[DATA_TYPE]{cleaner.output_suffix}',
             'optimization_features': [
                 'python-calamine engine (6-58x faster)',
                 'Comprehensive error logging',
                 'Data quality validation',
                 'Performance monitoring',
-                'Parallel file processing',
+                'Parallel file processing (process pool)',
                 'Memory-efficient batch processing'
             ],
             'error_log_file': str(cleaner.error_log_file),
@@ -186,14 +403,17 @@ def sepe_clean_data(context: AssetExecutionContext) -> Output[Dict]:
             'force_reprocess': force_reprocess
         }
         
-        logger.info(f"\n=== Optimized SEPE Processing Completed ===")
-        logger.info(f"XLS files processed: {summary['files_processed']}/{summary['total_xls_files']} ({summary['processing_rate_percent']}%)")
-        logger.info(f"Files skipped (already processed): {summary['files_skipped']}")
-        logger.info(f"Consolidated CSV files created: {summary['csv_files_managed']}")
-        logger.info(f"  → Unemployment files: {summary['unemployment_files']}")
-        logger.info(f"  → Contracts files: {summary['contracts_files']}")
-        logger.info(f"Parallel workers used: {summary['max_workers']}")
-        logger.info(f"Performance optimizations active: {len(summary['optimization_features'])}")
+        # One log event for the whole summary; each event is a separate event-log write
+        logger.info(
+            f"\n=== Optimized SEPE Processing Completed ===\n"
+            f"XLS files processed: {summary['files_processed']}/{summary['total_xls_files']} ({summary['processing_rate_percent']}%)\n"
+            f"Files skipped (already processed): {summary['files_skipped']}\n"
+            f"Consolidated files created: {summary['csv_files_managed']}\n"
+            f"  → Unemployment files: {summary['unemployment_files']}\n"
+            f"  → Contracts files: {summary['contracts_files']}\n"
+            f"Parallel workers used: {summary['max_workers']}\n"
+            f"Performance optimizations active: {len(summary['optimization_features'])}"
+        )
         
         return Output(
             summary,
@@ -243,51 +463,49 @@ def sepe_data_summary(context: AssetExecutionContext) -> Output[Dict]:
     """
     logger = get_dagster_logger()
     
-    import glob
-    from pathlib import Path
-    
     clean_dir = Path("/opt/dagster/clean/sepe")
     
     logger.info("Generating SEPE data summary report")
     
     try:
-        # Find all consolidated CSV files
-        unemployment_files = list(clean_dir.glob("*_unemployment.csv"))
-        contracts_files = list(clean_dir.glob("*_contracts.csv"))
-        
         # Analyze file patterns
         provinces = set()
         date_coverage = set()
-        
-        for file_path in unemployment_files + contracts_files:
-            # Parse filename: YEAR_MONTH_TYPE.csv
-            parts = file_path.stem.split('_')
-            if len(parts) >= 3:
-                year = parts[0]
-                month = parts[1] 
-                date_coverage.add(f"{year}-{month}")
-                
-                # Count provinces from actual file content
-                if file_path.suffix == '.csv':
-                    try:
-                        sample_df = pd.read_csv(file_path, nrows=100)  # Just sample to count provinces
-                        if 'province' in sample_df.columns:
-                            file_provinces = sample_df['province'].unique()
-                            provinces.update(file_provinces)
-                    except Exception:
-                        pass  # Skip if can't read file
-        
-        # Sample data analysis from a few files
+
+        manifest = load_sepe_manifest(clean_dir)
+        if manifest is not None:
+            logger.info("Using SEPE manifest written by sepe_clean_data")
+        else:
+            # Rebuild the manifest; only files not already covered are read
+            logger.info("SEPE manifest missing or stale, rebuilding it")
+            manifest = write_sepe_manifest(clean_dir)
+        
+        manifest_files = manifest['files']
+        unemployment_files = sorted(clean_dir / name for name, entry in manifest_files.items()
+                                    if entry['type'] == 'unemployment')
+        contracts_files = sorted(clean_dir / name for name, entry in manifest_files.items()
+                                 if entry['type'] == 'contracts')
+        for entry in manifest_files.values():
+            date_coverage.add(f"{entry['year']}-{entry['month']:02d}")
+            provinces.update(entry['provinces'])
+        
+        # Sample data analysis, reading the first file only when requested
+        config = context.op_config or {}
+        include_sample_analysis = config.get("include_sample_analysis", False)
         sample_analysis = {}
         if unemployment_files:
             sample_file = unemployment_files[0]
-            sample_df = pd.read_csv(sample_file)
             sample_analysis = {
                 'sample_file': sample_file.name,
-                'sample_records': len(sample_df),
-                'sample_columns': list(sample_df.columns),
-                'municipalities_in_sample': sample_df['municipality_code'].nunique()
+                'sample_records': manifest_files[sample_file.name]['rows']
             }
+            if include_sample_analysis:
+                sample_df = _read_clean_file(str(sample_file)).to_pandas()
+                sample_analysis.update({
+                    'sample_records': len(sample_df),
+                    'sample_columns': list(sample_df.columns),
+                    'municipalities_in_sample': sample_df['municipality_code'].nunique()
+                })
         
         summary_report = {
             'total_provinces': len(provinces),
@@ -300,15 +518,15 @@ def sepe_data_summary(context: AssetExecutionContext) -> Output[Dict]:
             'sample_analysis': sample_analysis,
             'data_organization': {
                 'output_dir': str(clean_dir),
-                'filename_pattern': "[YEAR]_[MONTH]_[DATA_TYPE].csv",
-                'format': 'Consolidated monthly files with province as column'
+                'filename_pattern': "[YEAR]_[MONTH]_[DATA_TYPE].parquet",
+                'format': 'Consolidated monthly Parquet files with province as column'
             }
         }
         
         logger.info(f"SEPE Summary Report:")
         logger.info(f"  Total provinces: {summary_report['total_provinces']}")
         logger.info(f"  Date coverage: {summary_report['date_coverage_months']} months")
-        logger.info(f"  Total CSV files: {summary_report['total_files']}")
+        logger.info(f"  Total files: {summary_report['total_files']}")
         logger.info(f"  Date range: {summary_report['date_range'][0] if summary_report['date_range'] else 'N/A'} to {summary_report['date_range'][-1] if summary_report['date_range'] else 'N/A'}")
         
         return Output(
@@ -328,166 +546,170 @@ def sepe_data_summary(context: AssetExecutionContext) -> Output[Dict]:
         raise
 
 
-@asset(
-    description="Load SEPE unemployment data into PostgreSQL raw schema",
-    group_name="sepe_etl",
-    deps=[sepe_clean_data]
-)
-def load_sepe_unemployment_to_postgres(context: AssetExecutionContext) -> Output[dict]:
+def _load_sepe_category(data_category: str, logger, force_reload: bool = False) -> Output[dict]:
     """
-    Load cleaned SEPE unemployment CSV files into PostgreSQL raw schema.
+    Load one category of cleaned SEPE files into its PostgreSQL raw table.
     
-    This asset loads all unemployment CSV files from clean/sepe/ directory
-    into a single PostgreSQL table in the raw schema with proper data types
-    and metadata.
+    Shared by the unemployment and contracts loader assets: streams every
+    consolidated file for data_category into raw.raw_sepe_<data_category>.
+    The load is skipped when the set of files and their mtimes matches what the
+    last complete load recorded in raw.sepe_load_state, unless force_reload is
+    set. A load with failed files records nothing, so the next run retries it.
     
     Returns:
         Output containing loading statistics and metadata
     """
-    logger = get_dagster_logger()
-    
     clean_path = "/opt/dagster/clean/sepe"
-    unemployment_files = glob.glob(f"{clean_path}/*_unemployment.csv")
+    category_files = _clean_files(clean_path, data_category)
     
-    logger.info(f"Found {len(unemployment_files)} unemployment CSV files in {clean_path}")
+    logger.info(f"Found {len(category_files)} {data_category} files in {clean_path}")
     
-    if len(unemployment_files) == 0:
-        logger.warning("No unemployment CSV files found! Check if SEPE cleaning worked.")
+    if len(category_files) == 0:
+        logger.warning(f"No {data_category} files found! Check if SEPE cleaning worked.")
         return Output(
             {"rows_loaded": 0, "files_processed": 0},
-            metadata={"error": "No unemployment CSV files found to load"}
+            metadata={"error": f"No {data_category} files found to load"}
         )
     
     try:
         engine = get_db_connection()
         logger.info("Database connection established")
         
-        # Ensure raw schema exists
-        with engine.connect() as conn:
-            conn.execute(text("CREATE SCHEMA IF NOT EXISTS raw;"))
-            conn.commit()
-            logger.info("Raw schema ensured")
-        
         # Process files with proper transaction management
         files_processed = 0
-        table_name = "raw_sepe_unemployment"
-        ingestion_timestamp = pd.Timestamp.now()
-        
-        logger.info("Processing unemployment CSV files with batch loading")
-        
-        # Handle table setup first
-        with engine.connect() as conn:
-            table_exists_query = text("""
-                SELECT EXISTS (
-                    SELECT FROM information_schema.tables 
-                    WHERE table_schema = 'raw' 
-                    AND table_name = 'raw_sepe_unemployment'
-                );
-            """)
-            table_exists = conn.execute(table_exists_query).fetchone()[0]
-            
-            if table_exists:
-                logger.info("Table exists, truncating data to preserve dependent views")
-                truncate_query = text("TRUNCATE TABLE raw.raw_sepe_unemployment")
-                conn.execute(truncate_query)
-                conn.commit()
+        table_name = f"raw_sepe_{data_category}"
+        unlogged = get_data_source_config('sepe').unlogged_raw_table
+        
+        # Nothing to do if the last complete load read exactly these files, unchanged.
+        # Only the data files are compared: sidecars (fingerprints, manifest, cache) are
+        # rewritten in the same directory on every cleaning run
+        file_state = _clean_file_state(category_files)
+        if not force_reload:
+            if _recorded_load_state(engine, table_name) == file_state:
+                logger.info(f"raw.{table_name} is up to date with {clean_path}, skipping load")
+                return Output(
+                    {"rows_loaded": 0, "files_processed": 0, "skipped": True, "table_name": f"raw.{table_name}"},
+                    metadata={
+                        "table_name": f"raw.{table_name}",
+                        "skipped": True,
+                        "reason": "Same files, unchanged, as the last complete load"
+                    }
+                )
         
-        # Process files with fresh connections
-        first_file = True
-        for csv_file in unemployment_files:
-            filename = Path(csv_file).name
-            
-            try:
-                logger.info(f"Processing {filename}")
-                
-                # Read and process CSV
-                df = pd.read_csv(csv_file)
+        logger.info(f"Processing {data_category} files with streaming COPY")
+        
+        rows_loaded = 0
+        # Per-file outcomes are reported once after the loop, not as one log event per file
+        empty_files = []
+        failed_files = {}
+        
+        # One transaction for TRUNCATE and every COPY, so readers never see a partial load
+        raw_conn = engine.raw_connection()
+        try:
+            with raw_conn.cursor() as cur:
+                # Idempotent table setup in one round trip; TRUNCATE keeps dependent views intact
+                cur.execute(
+                    "CREATE SCHEMA IF NOT EXISTS raw;"
+                    + SEPE_LOAD_STATE_DDL + ";"
+                    + _sepe_table_ddl(table_name, data_category) + ";"
+                    + _sepe_defaults_ddl(table_name, data_category) + ";"
+                    + f"TRUNCATE TABLE raw.{table_name};"
+                    + bulk_load_prepare_sql(table_name, unlogged=unlogged)
+                )
                 
-                if len(df) == 0:
-                    logger.warning(f"Skipping {filename} - empty CSV file")
-                    continue
+                # Stream each file through COPY so only one file is held in memory at a time
+                for clean_file in category_files:
+                    filename = Path(clean_file).name
+                    cur.execute("SAVEPOINT sepe_file")
+                    
+                    try:
+                        table = _read_clean_file(clean_file)
+                        
+                        if table.num_rows == 0:
+                            empty_files.append(filename)
+                            continue
+                        
+                        # Metadata constants are filled in by the column DEFAULTs
+                        table = _with_source_file(table, filename)
+                        _copy_arrow_table(cur, table, f"raw.{table_name}")
+                        cur.execute("RELEASE SAVEPOINT sepe_file")
+                        
+                        rows_loaded += table.num_rows
+                        files_processed += 1
+                        
+                    except Exception as e:
+                        failed_files[filename] = str(e)
+                        cur.execute("ROLLBACK TO SAVEPOINT sepe_file")
+                        continue
                 
-                # Add metadata columns efficiently
-                df = df.assign(
-                    source_file=filename,
-                    data_source='SEPE',
-                    data_source_full='Servicio Público de Empleo Estatal',
-                    data_category='unemployment',
-                    ingestion_timestamp=ingestion_timestamp
-                )
+                # Autovacuum is off for the raw table, so refresh planner statistics explicitly
+                cur.execute(f"ANALYZE raw.{table_name}")
                 
-                # Load to PostgreSQL with proper handling
-                if first_file and not table_exists:
-                    # Create new table
-                    df.to_sql(
-                        name=table_name,
-                        con=engine,
-                        schema='raw',
-                        if_exists='replace',
-                        index=False,
-                        method='multi',
-                        chunksize=5000
-                    )
-                    logger.info(f"Created new unemployment table with {len(df):,} rows from {filename}")
-                    first_file = False
+                # Record what was loaded; a partial load clears the record so the next run reloads
+                if failed_files:
+                    cur.execute("DELETE FROM raw.sepe_load_state WHERE table_name = %s", (table_name,))
                 else:
-                    # Append to existing table
-                    df.to_sql(
-                        name=table_name,
-                        con=engine,
-                        schema='raw',
-                        if_exists='append',
-                        index=False,
-                        method='multi',
-                        chunksize=5000
+                    cur.execute(
+                        "INSERT INTO raw.sepe_load_state (table_name, files) VALUES (%s, %s::jsonb) "
+                        "ON CONFLICT (table_name) DO UPDATE SET files = EXCLUDED.files, loaded_at = now()",
+                        (table_name, json.dumps(file_state))
                     )
-                    logger.info(f"Appended {len(df):,} unemployment rows from {filename}")
-                    first_file = False
-                
-                files_processed += 1
                 
-            except Exception as e:
-                logger.error(f"Failed to process {filename}: {e}")
-                continue
+            raw_conn.commit()
+        finally:
+            raw_conn.close()
+        
+        if empty_files:
+            logger.warning(f"Skipped {len(empty_files)} empty {data_category} files: {', '.join(empty_files)}")
+        if failed_files:
+            logger.error(
+                f"Failed to process {len(failed_files)} {data_category} files:\n"
+                + "\n".join(f"  {filename}: {error}" for filename, error in failed_files.items())
+            )
+        logger.info(f"Loaded {rows_loaded:,} {data_category} rows from {files_processed} files")
         
         if files_processed == 0:
-            logger.error("No unemployment files were successfully processed!")
+            logger.error(f"No {data_category} files were successfully processed!")
             return Output(
                 {"rows_loaded": 0, "files_processed": 0},
-                metadata={"error": "No unemployment files were successfully processed"}
+                metadata={"error": f"No {data_category} files were successfully processed"}
             )
         
-        logger.info(f"Successfully processed {files_processed} unemployment files")
+        logger.info(f"Successfully processed {files_processed} {data_category} files")
         
         return Output(
             {
-                "rows_loaded": files_processed,  # Count of files processed as indicator
+                "rows_loaded": rows_loaded,
                 "files_processed": files_processed,
-                "table_name": "raw.raw_sepe_unemployment"
+                "table_name": f"raw.{table_name}"
             },
             metadata={
-                "table_name": "raw.raw_sepe_unemployment",
+                "table_name": f"raw.{table_name}",
                 "files_processed": files_processed,
+                "rows_loaded": rows_loaded,
+                "files_empty": len(empty_files),
+                "files_failed": len(failed_files),
             }
         )
         
     except Exception as e:
-        logger.error(f"Failed to load unemployment data to PostgreSQL: {e}")
+        logger.error(f"Failed to load {data_category} data to PostgreSQL: {e}")
         import traceback
         logger.error(f"Traceback: {traceback.format_exc()}")
         raise
 
 
 @asset(
-    description="Load SEPE contracts data into PostgreSQL raw schema",
+    description="Load SEPE unemployment data into PostgreSQL raw schema",
     group_name="sepe_etl",
-    deps=[sepe_clean_data]
+    deps=[create_raw_schema, sepe_clean_data],
+    op_tags={"municipality/pool": "postgres_write"}
 )
-def load_sepe_contracts_to_postgres(context: AssetExecutionContext) -> Output[dict]:
+def load_sepe_unemployment_to_postgres(context: AssetExecutionContext) -> Output[dict]:
     """
-    Load cleaned SEPE contracts CSV files into PostgreSQL raw schema.
+    Load cleaned SEPE unemployment Parquet files into PostgreSQL raw schema.
     
-    This asset loads all contracts CSV files from clean/sepe/ directory
+    This asset loads all unemployment Parquet files (or legacy CSV files) from clean/sepe/ directory
     into a single PostgreSQL table in the raw schema with proper data types
     and metadata.
     
@@ -495,134 +717,27 @@ def load_sepe_contracts_to_postgres(context: AssetExecutionContext) -> Output[di
         Output containing loading statistics and metadata
     """
     logger = get_dagster_logger()
+    config = context.op_config or {}
+    return _load_sepe_category('unemployment', logger, force_reload=config.get("force_reload", False))
+
+
+@asset(
+    description="Load SEPE contracts data into PostgreSQL raw schema",
+    group_name="sepe_etl",
+    deps=[create_raw_schema, sepe_clean_data],
+    op_tags={"municipality/pool": "postgres_write"}
+)
+def load_sepe_contracts_to_postgres(context: AssetExecutionContext) -> Output[dict]:
+    """
+    Load cleaned SEPE contracts Parquet files into PostgreSQL raw schema.
     
-    clean_path = "/opt/dagster/clean/sepe"
-    contracts_files = glob.glob(f"{clean_path}/*_contracts.csv")
-    
-    logger.info(f"Found {len(contracts_files)} contracts CSV files in {clean_path}")
-    
-    if len(contracts_files) == 0:
-        logger.warning("No contracts CSV files found! Check if SEPE cleaning worked.")
-        return Output(
-            {"rows_loaded": 0, "files_processed": 0},
-            metadata={"error": "No contracts CSV files found to load"}
-        )
+    This asset loads all contracts Parquet files (or legacy CSV files) from clean/sepe/ directory
+    into a single PostgreSQL table in the raw schema with proper data types
+    and metadata.
     
-    try:
-        engine = get_db_connection()
-        logger.info("Database connection established")
-        
-        # Ensure raw schema exists
-        with engine.connect() as conn:
-            conn.execute(text("CREATE SCHEMA IF NOT EXISTS raw;"))
-            conn.commit()
-            logger.info("Raw schema ensured")
-        
-        # Process files with proper transaction management  
-        files_processed = 0
-        table_name = "raw_sepe_contracts"
-        ingestion_timestamp = pd.Timestamp.now()
-        
-        logger.info("Processing contracts CSV files with batch loading")
-        
-        # Handle table setup first
-        with engine.connect() as conn:
-            table_exists_query = text("""
-                SELECT EXISTS (
-                    SELECT FROM information_schema.tables 
-                    WHERE table_schema = 'raw' 
-                    AND table_name = 'raw_sepe_contracts'
-                );
-            """)
-            table_exists = conn.execute(table_exists_query).fetchone()[0]
-            
-            if table_exists:
-                logger.info("Table exists, truncating data to preserve dependent views")
-                truncate_query = text("TRUNCATE TABLE raw.raw_sepe_contracts")
-                conn.execute(truncate_query)
-                conn.commit()
-        
-        # Process files with fresh connections
-        first_file = True
-        for csv_file in contracts_files:
-            filename = Path(csv_file).name
-            
-            try:
-                logger.info(f"Processing {filename}")
-                
-                # Read and process CSV
-                df = pd.read_csv(csv_file)
-                
-                if len(df) == 0:
-                    logger.warning(f"Skipping {filename} - empty CSV file")
-                    continue
-                
-                # Add metadata columns efficiently
-                df = df.assign(
-                    source_file=filename,
-                    data_source='SEPE',
-                    data_source_full='Servicio Público de Empleo Estatal',
-                    data_category='contracts',
-                    ingestion_timestamp=ingestion_timestamp
-                )
-                
-                # Load to PostgreSQL with proper handling
-                if first_file and not table_exists:
-                    # Create new table
-                    df.to_sql(
-                        name=table_name,
-                        con=engine,
-                        schema='raw',
-                        if_exists='replace',
-                        index=False,
-                        method='multi',
-                        chunksize=5000
-                    )
-                    logger.info(f"Created new contracts table with {len(df):,} rows from {filename}")
-                    first_file = False
-                else:
-                    # Append to existing table
-                    df.to_sql(
-                        name=table_name,
-                        con=engine,
-                        schema='raw',
-                        if_exists='append',
-                        index=False,
-                        method='multi',
-                        chunksize=5000
-                    )
-                    logger.info(f"Appended {len(df):,} contracts rows from {filename}")
-                    first_file = False
-                
-                files_processed += 1
-                
-            except Exception as e:
-                logger.error(f"Failed to process {filename}: {e}")
-                continue
-        
-        if files_processed == 0:
-            logger.error("No contracts files were successfully processed!")
-            return Output(
-                {"rows_loaded": 0, "files_processed": 0},
-                metadata={"error": "No contracts files were successfully processed"}
-            )
-        
-        logger.info(f"Successfully processed {files_processed} contracts files")
-        
-        return Output(
-            {
-                "rows_loaded": files_processed,  # Count of files processed as indicator
-                "files_processed": files_processed,
-                "table_name": "raw.raw_sepe_contracts"
-            },
-            metadata={
-                "table_name": "raw.raw_sepe_contracts",
-                "files_processed": files_processed,
-            }
-        )
-        
-    except Exception as e:
-        logger.error(f"Failed to load contracts data to PostgreSQL: {e}")
-        import traceback
-        logger.error(f"Traceback: {traceback.format_exc()}")
-        raise
\ No newline at end of file
+    Returns:
+        Output containing loading statistics and metadata
+    """
+    logger = get_dagster_logger()
+    config = context.op_config or {}
+    return _load_sepe_category('contracts', logger, force_reload=config.get("force_reload", False))
@@ -6,7 +6,7 @@ Defines the orchestration jobs that coordinate asset execution:
 2. Full integrated pipeline for end-to-end analytics
 """
 
-from dagster import job
+from dagster import job, multiprocess_executor
 
 from ..assets.demography import (
     convert_demography_excel_to_csv,
@@ -29,6 +29,19 @@ from ..assets.sepe_unemployment import (
 )
 
 
+# The codes, demography and SEPE branches share nothing until dbt, so run them in
+# separate processes. Ops are tagged with a "municipality/pool" so Excel parsing,
+# web scraping and Postgres writes are throttled independently within a run.
+parallel_executor = multiprocess_executor.configured({
+    "max_concurrent": 4,
+    "tag_concurrency_limits": [
+        {"key": "municipality/pool", "value": "excel_io", "limit": 2},
+        {"key": "municipality/pool", "value": "http_scrape", "limit": 4},
+        {"key": "municipality/pool", "value": "postgres_write", "limit": 1}
+    ]
+})
+
+
 @job
 def codes_data_etl_pipeline():
     """
@@ -60,7 +73,7 @@ def demography_etl_pipeline():
     
     Processes 28 years of Spanish municipality population data (1996-2024):
     1. PostgreSQL schema initialization (shared infrastructure)
-    2. Excel to CSV conversion with smart header detection
+    2. Excel to Parquet conversion with smart header detection
     3. Data standardization and loading to raw tables
     
     Key features:
@@ -76,7 +89,7 @@ def demography_etl_pipeline():
     db_loading = load_demography_to_postgres()
 
 
-@job
+@job(executor_def=parallel_executor)
 def full_analytics_pipeline():
     """
     Complete end-to-end analytics pipeline.
@@ -97,6 +110,7 @@ def full_analytics_pipeline():
     ```
     
     Dependencies are automatically resolved:
+    - Schema creation is the shared root; the three branches run in parallel
     - dbt models wait for all data sources to be ready
     - All data quality validations must pass
     - Comprehensive error handling and rollback capabilities
@@ -4,41 +4,73 @@ Database resources and configuration for municipality analytics pipeline.
 Provides database connections and data source configurations.
 """
 
+import atexit
+import functools
+import io
 import os
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass
+from types import MappingProxyType
 from sqlalchemy import create_engine
-from typing import Dict, Any
+from typing import Dict, Mapping, Optional, Set, Tuple
+
+
+@dataclass(frozen=True, slots=True)
+class DataSourceConfig:
+    """Immutable configuration for one external data source."""
+    source_name: str
+    source_full_name: str
+    category: str
+    url: str
+    description: str
+    update_frequency: str
+    years_available: Optional[range] = None
+    unlogged_raw_table: bool = False  # Raw table is fully reloaded each run, so skip WAL
 
 
 # Data source configuration registry
-DATA_SOURCES: Dict[str, Dict[str, Any]] = {
-    'demography': {
-        'source_name': 'INE',
-        'source_full_name': 'Instituto Nacional de Estadística',
-        'category': 'demography',
-        'url': 'https://www.ine.es/jaxiT3/Tabla.htm?t=2852',
-        'description': 'Municipal population data by year',
-        'years_available': list(range(1996, 2025)),
-        'update_frequency': 'annual'
-    },
+_DATA_SOURCES: Dict[str, DataSourceConfig] = {
+    'demography': DataSourceConfig(
+        source_name='INE',
+        source_full_name='Instituto Nacional de Estadística',
+        category='demography',
+        url='https://www.ine.es/jaxiT3/Tabla.htm?t=2852',
+        description='Municipal population data by year',
+        years_available=range(1996, 2025),
+        update_frequency='annual',
+        unlogged_raw_table=True
+    ),
+    'sepe': DataSourceConfig(
+        source_name='SEPE',
+        source_full_name='Servicio Público de Empleo Estatal',
+        category='employment',
+        url='https://www.sepe.es/HomeSepe/es/que-es-el-sepe/estadisticas/datos-estadisticos/municipios.html',
+        description='Monthly registered unemployment and contracts by municipality',
+        update_frequency='monthly',
+        unlogged_raw_table=True
+    ),
     # Future data sources can be added here
-    'economy': {
-        'source_name': 'Banco de España',
-        'source_full_name': 'Banco de España',
-        'category': 'economy', 
-        'url': 'https://www.bde.es/',
-        'description': 'Economic indicators by municipality',
-        'years_available': list(range(2010, 2025)),
-        'update_frequency': 'quarterly'
-    }
+    'economy': DataSourceConfig(
+        source_name='Banco de España',
+        source_full_name='Banco de España',
+        category='economy',
+        url='https://www.bde.es/',
+        description='Economic indicators by municipality',
+        years_available=range(2010, 2025),
+        update_frequency='quarterly'
+    )
 }
 
+# Read-only view shared by all callers
+DATA_SOURCES: Mapping[str, DataSourceConfig] = MappingProxyType(_DATA_SOURCES)
+
 
 def get_db_connection():
     """
     Create database connection using environment variables.
     
     Returns:
-        SQLAlchemy engine for PostgreSQL database
+        Shared, pooled SQLAlchemy engine for the PostgreSQL database
         
     Raises:
         ValueError: If required environment variables are missing
@@ -61,10 +93,171 @@ def get_db_connection():
     db_name = os.getenv('DAGSTER_POSTGRES_DB')
     
     connection_string = f"postgresql://{db_user}:{db_password}@{db_host}:{db_port}/{db_name}"
-    return create_engine(connection_string)
+    return _engine_for(connection_string)
+
+
+@functools.lru_cache(maxsize=None)
+def _engine_for(connection_string: str):
+    """
+    Create (once per process) a pooled engine for a connection string.
+    
+    Assets running in the same process share the engine and its connection pool
+    instead of opening a new connection per call. Pre-ping discards connections
+    the server has closed, and recycling keeps them under idle timeouts.
+    """
+    engine = create_engine(
+        connection_string,
+        # Let psycopg2 batch executemany() INSERTs into multi-row pages on its side
+        executemany_mode='values_plus_batch',
+        pool_size=8,
+        max_overflow=4,
+        pool_pre_ping=True,
+        pool_recycle=1800
+    )
+    # Close pooled connections cleanly when the process exits
+    atexit.register(engine.dispose)
+    return engine
+
+
+# (database URL, schema) pairs already ensured by this process
+_ENSURED_SCHEMAS: Set[Tuple[str, str]] = set()
+
+
+def ensure_schema(engine, schema: str = "raw") -> bool:
+    """
+    Create a schema if it doesn't exist, at most once per process and database.
+    
+    The DDL runs under a transaction-scoped advisory lock, so concurrent ops in
+    a multiprocess run don't race on CREATE SCHEMA IF NOT EXISTS.
+    
+    Args:
+        engine: SQLAlchemy engine from get_db_connection()
+        schema: Schema name (default 'raw')
+        
+    Returns:
+        True if the DDL was executed, False if this process had already ensured it
+    """
+    key = (engine.url.render_as_string(hide_password=True), schema)
+    if key in _ENSURED_SCHEMAS:
+        return False
+    
+    raw_conn = engine.raw_connection()
+    try:
+        with raw_conn.cursor() as cur:
+            cur.execute("SELECT pg_advisory_xact_lock(hashtext(%s))", (f"municipality_schema_{schema}",))
+            cur.execute(f"CREATE SCHEMA IF NOT EXISTS {schema}")
+        raw_conn.commit()
+    finally:
+        raw_conn.close()
+    
+    _ENSURED_SCHEMAS.add(key)
+    return True
+
+
+def bulk_load_prepare_sql(table: str, schema: str = "raw", unlogged: bool = False) -> str:
+    """
+    SQL to run inside a bulk load transaction, before the data is copied.
+    
+    Turns off synchronous commit for the transaction and, for append-only raw
+    tables that are fully reloaded each run, makes the table UNLOGGED with
+    autovacuum disabled so the load writes no WAL. Unlogged tables are emptied
+    after a crash, which the next reload repairs.
+    
+    Args:
+        table: Target table name
+        schema: Target schema (default 'raw')
+        unlogged: Whether to switch the table to UNLOGGED
+        
+    Returns:
+        Semicolon-separated SQL statements
+    """
+    statements = ["SET LOCAL synchronous_commit = off"]
+    if unlogged:
+        statements.append(f"ALTER TABLE {schema}.{table} SET UNLOGGED")
+        statements.append(f"ALTER TABLE {schema}.{table} SET (autovacuum_enabled = false)")
+    return ";\n".join(statements) + ";"
+
+
+def bulk_copy_dataframes(engine, frames, table: str, schema: str = "raw", columns=None,
+                         synchronous_commit: bool = True) -> int:
+    """
+    Stream an iterable of DataFrame chunks into a table with COPY, in one transaction.
+    
+    While one chunk is being copied on a background thread, the next is produced
+    and serialized, so reading and writing overlap and only two chunks are held
+    in memory at a time. Either every chunk is loaded or none is.
+    
+    Args:
+        engine: SQLAlchemy engine from get_db_connection()
+        frames: Iterable of DataFrames with the same columns
+        table: Target table name
+        schema: Target schema (default 'raw')
+        columns: Columns to load (defaults to the first chunk's columns)
+        synchronous_commit: Set False to skip waiting for the WAL flush on commit
+        
+    Returns:
+        Number of rows copied
+    """
+    rows_copied = 0
+    pending = None
+    raw_conn = engine.raw_connection()
+    try:
+        with raw_conn.cursor() as cur, ThreadPoolExecutor(max_workers=1) as copier:
+            if not synchronous_commit:
+                cur.execute("SET LOCAL synchronous_commit = off")
+            
+            for df in frames:
+                if columns is None:
+                    columns = list(df.columns)
+                buffer = io.StringIO()
+                df.to_csv(buffer, columns=columns, index=False, header=False, na_rep='\\N')
+                buffer.seek(0)
+                rows_copied += len(df)
+                
+                # Wait for the previous chunk before reusing the cursor
+                if pending is not None:
+                    pending.result()
+                column_list = ', '.join(f'"{column}"' for column in columns)
+                pending = copier.submit(
+                    cur.copy_expert,
+                    f"COPY {schema}.{table} ({column_list}) FROM STDIN WITH (FORMAT CSV, NULL '\\N')",
+                    buffer
+                )
+            
+            if pending is not None:
+                pending.result()
+        raw_conn.commit()
+    except Exception:
+        raw_conn.rollback()
+        raise
+    finally:
+        raw_conn.close()
+    
+    return rows_copied
+
+
+def latest_ingestion_epoch(engine, table: str, schema: str = "raw") -> float:
+    """
+    Epoch seconds of the table's newest ingestion_timestamp, or 0 if the table is missing or empty
+    
+    Tables created by to_sql have a naive timestamp column holding this host's local
+    time, which Postgres' extract(epoch) would read as UTC. The value is converted in
+    Python instead: naive datetimes as local time, timestamptz values as-is.
+    """
+    raw_conn = engine.raw_connection()
+    try:
+        with raw_conn.cursor() as cur:
+            cur.execute("SELECT to_regclass(%s) IS NOT NULL", (f"{schema}.{table}",))
+            if not cur.fetchone()[0]:
+                return 0
+            cur.execute(f"SELECT max(ingestion_timestamp) FROM {schema}.{table}")
+            latest = cur.fetchone()[0]
+            return latest.timestamp() if latest is not None else 0
+    finally:
+        raw_conn.close()
 
 
-def get_data_source_config(source_name: str) -> Dict[str, Any]:
+def get_data_source_config(source_name: str) -> DataSourceConfig:
     """
     Get configuration for a specific data source.
     
@@ -72,7 +265,7 @@ def get_data_source_config(source_name: str) -> Dict[str, Any]:
         source_name: Name of the data source (e.g., 'demography', 'economy')
         
     Returns:
-        Dictionary containing source configuration
+        DataSourceConfig for the source
         
     Raises:
         KeyError: If source_name is not found in DATA_SOURCES
@@ -84,11 +277,11 @@ def get_data_source_config(source_name: str) -> Dict[str, Any]:
     return DATA_SOURCES[source_name]
 
 
-def get_all_data_sources() -> Dict[str, Dict[str, Any]]:
+def get_all_data_sources() -> Mapping[str, DataSourceConfig]:
     """
     Get all available data source configurations.
     
     Returns:
-        Dictionary of all data source configurations
+        Read-only mapping of all data source configurations
     """
-    return DATA_SOURCES.copy()
\ No newline at end of file
+    return DATA_SOURCES
\ No newline at end of file
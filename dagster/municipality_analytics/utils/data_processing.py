@@ -7,9 +7,55 @@ Contains functions for:
 - DataFrame cleaning and validation
 """
 
+import functools
+from collections import Counter
+import numpy as np
 import pandas as pd
 import re
-from typing import Optional
+from typing import Optional, Tuple
+
+
+# Column classification rules, tried in order; the first alternative that matches wins.
+# Each alternative is a set of lookaheads over the lowercased column name.
+_COLUMN_PATTERN = re.compile(
+    r"(?P<pop>pob\d{2})"                                         # pob98, pob99, ...
+    r"|(?P<muncode>(?=.*(?:cod|cmun))(?=.*municipio))"            # codigo/cod/cmun + municipio
+    r"|(?P<munname>(?!.*codigo)(?=.*(?:municipio|nombre)))"
+    r"|(?P<provcode>(?=.*(?:cpro|cod_prov|codigo_prov)))"
+    r"|(?P<provname>(?!.*(?:codigo|cpro))(?=.*provincia))"
+    r"|(?P<province>province\Z)"                                  # Ambiguous, resolved from data
+    r"|(?P<male>(?=.*(?:varon|hombre|masculino)))"
+    r"|(?P<female>(?=.*(?:mujer|femenin)))"
+    r"|(?P<total>(?=.*(?:total|ambos|suma)))"
+    r"|(?P<ccaa>(?=.*(?:comunidad|autonoma|ccaa)))"
+    r"|(?P<island>(?=.*isla))",
+    re.DOTALL
+)
+
+# Column name cleanup: separators become underscores, any other non-word character is dropped
+_SEPARATOR_TABLE = str.maketrans(' /-', '___')
+_NON_WORD_PATTERN = re.compile(r"\W")
+
+_TAG_TO_COLUMN = {
+    'pop': 'population_total',
+    'muncode': 'municipality_code',
+    'munname': 'municipality_name',
+    'provcode': 'province_code',
+    'provname': 'province_name',
+    'male': 'population_male',
+    'female': 'population_female',
+    'total': 'population_total',
+    'ccaa': 'autonomous_community',
+    'island': 'island'
+}
+
+# Header cells are strings that aren't just digits with '.'/',' separators
+_IS_TEXT_CELL = np.frompyfunc(
+    lambda value: isinstance(value, str) and not value.replace('.', '').replace(',', '').isdigit(), 1, 1
+)
+
+# Placeholder for a "province" column that may hold codes or names
+_AMBIGUOUS_PROVINCE = '__AMBIGUOUS_PROVINCE__'
 
 
 def detect_header_row(df: pd.DataFrame, max_rows_to_check: int = 10) -> int:
@@ -26,28 +72,20 @@ def detect_header_row(df: pd.DataFrame, max_rows_to_check: int = 10) -> int:
     Returns:
         Index of the row containing headers (0-based)
     """
-    for row_idx in range(min(max_rows_to_check, len(df))):
-        row_data = df.iloc[row_idx]
-        
-        # Skip completely empty rows
-        if row_data.isna().all():
-            continue
-            
-        # Check if this row looks like headers (mostly text, not numbers)
-        non_null_values = row_data.dropna()
-        if len(non_null_values) < 2:  # Need at least 2 non-null values
-            continue
-            
-        # Count text vs numeric values
-        text_count = sum(
-            1 for val in non_null_values 
-            if isinstance(val, str) and not str(val).replace('.', '').replace(',', '').isdigit()
-        )
-        numeric_count = len(non_null_values) - text_count
-        
-        # If mostly text, this is likely the header row
-        if text_count >= numeric_count and len(non_null_values) >= 3:
-            return row_idx
+    # Classify every candidate cell in one pass instead of looping over rows
+    cells = df.head(max_rows_to_check).to_numpy(dtype=object)
+    non_null = pd.notna(cells)
+    is_text = _IS_TEXT_CELL(cells).astype(bool) & non_null
+    
+    # Count text vs numeric values per row
+    non_null_count = non_null.sum(axis=1)
+    text_count = is_text.sum(axis=1)
+    numeric_count = non_null_count - text_count
+    
+    # If mostly text (with at least 3 values), this is likely the header row
+    candidates = np.flatnonzero((text_count >= numeric_count) & (non_null_count >= 3))
+    if candidates.size:
+        return int(candidates[0])
     
     # Default to row 1 (index 1) if no clear header found
     return 1
@@ -71,56 +109,22 @@ def standardize_demography_columns(df: pd.DataFrame, year: int) -> pd.DataFrame:
     Returns:
         DataFrame with standardized column names
     """
-    new_columns = []
-    for col in df.columns:
-        col_str = str(col).strip().lower()
-        
-        # Standardize population columns (pob98, pob99, etc.)
-        if re.match(r'pob\d{2}', col_str):
-            new_columns.append('population_total')
-        # Municipality code columns
-        elif any(term in col_str for term in ['codigo', 'cod', 'cmun']) and 'municipio' in col_str:
-            new_columns.append('municipality_code')
-        # Municipality name columns
-        elif any(term in col_str for term in ['municipio', 'nombre']) and 'codigo' not in col_str:
-            new_columns.append('municipality_name')
-        # Province CODE columns (cpro, codigo_provincia, etc.)
-        elif any(term in col_str for term in ['cpro', 'cod_prov', 'codigo_prov']):
-            new_columns.append('province_code')
-        # Province NAME columns (provincia, nombre_provincia, etc.)
-        elif 'provincia' in col_str and 'codigo' not in col_str and 'cpro' not in col_str:
-            new_columns.append('province_name')
-        # Handle ambiguous "province" column
-        elif col_str == 'province':
-            # Determine if this is code or name based on data inspection
-            if len(df) > 0:
-                sample_values = df[col].dropna().head(10)
-                if (sample_values.dtype in ['int64', 'float64'] or 
-                    all(str(val).isdigit() for val in sample_values if pd.notna(val))):
-                    new_columns.append('province_code')
-                else:
-                    new_columns.append('province_name')
+    # Many years share identical headers, so the classification is memoized on the header tuple
+    new_columns = list(_classify_columns(tuple(map(str, df.columns))))
+    
+    # Ambiguous "province" column: determine if this is code or name based on data inspection
+    for position, column in enumerate(new_columns):
+        if column != _AMBIGUOUS_PROVINCE:
+            continue
+        if len(df) > 0:
+            sample_values = df.iloc[:, position].dropna().head(10)
+            if (sample_values.dtype in ['int64', 'float64'] or 
+                all(str(val).isdigit() for val in sample_values if pd.notna(val))):
+                new_columns[position] = 'province_code'
             else:
-                new_columns.append('province_code')  # Default assumption
-        # Male population columns
-        elif any(term in col_str for term in ['varon', 'hombre', 'varones', 'hombres', 'masculino']):
-            new_columns.append('population_male')
-        # Female population columns
-        elif any(term in col_str for term in ['mujer', 'mujeres', 'femenino', 'femenina']):
-            new_columns.append('population_female')
-        # Total/both sexes columns
-        elif any(term in col_str for term in ['total', 'ambos_sexos', 'ambos', 'suma', 'totales']):
-            new_columns.append('population_total')
-        # Autonomous community columns
-        elif any(term in col_str for term in ['comunidad', 'autonoma', 'ccaa']):
-            new_columns.append('autonomous_community')
-        # Island columns (for Canarias/Baleares)
-        elif any(term in col_str for term in ['isla', 'island']):
-            new_columns.append('island')
+                new_columns[position] = 'province_name'
         else:
-            # Clean other column names
-            clean_name = _clean_column_name(col_str)
-            new_columns.append(clean_name or f'unnamed_column_{len(new_columns)}')
+            new_columns[position] = 'province_code'  # Default assumption
     
     # Handle duplicate column names by adding suffixes
     final_columns = _handle_duplicate_columns(new_columns)
@@ -132,6 +136,33 @@ def standardize_demography_columns(df: pd.DataFrame, year: int) -> pd.DataFrame:
     return df
 
 
+@functools.lru_cache(maxsize=64)
+def _classify_columns(columns: Tuple[str, ...]) -> Tuple[str, ...]:
+    """
+    Map raw INE column names to standardized names.
+    
+    Columns whose meaning depends on the data are returned as the
+    _AMBIGUOUS_PROVINCE sentinel for the caller to resolve.
+    """
+    new_columns = []
+    for col in columns:
+        col_str = col.strip().lower()
+        
+        # One combined regex scan per column, dispatched on the matching rule
+        match = _COLUMN_PATTERN.match(col_str)
+        tag = match.lastgroup if match else None
+        
+        if tag == 'province':
+            new_columns.append(_AMBIGUOUS_PROVINCE)
+        elif tag is not None:
+            new_columns.append(_TAG_TO_COLUMN[tag])
+        else:
+            # Clean other column names
+            clean_name = _clean_column_name(col_str)
+            new_columns.append(clean_name or f'unnamed_column_{len(new_columns)}')
+    return tuple(new_columns)
+
+
 def clean_dataframe(df: pd.DataFrame, year: Optional[int] = None) -> pd.DataFrame:
     """
     Clean DataFrame by removing empty rows/columns and standardizing names.
@@ -143,8 +174,9 @@ def clean_dataframe(df: pd.DataFrame, year: Optional[int] = None) -> pd.DataFram
     Returns:
         Cleaned DataFrame
     """
-    # Remove completely empty rows and columns
-    df = df.dropna(how='all').dropna(how='all', axis=1)
+    # Remove completely empty rows and columns from one shared null mask
+    not_null = df.notna().to_numpy()
+    df = df.iloc[not_null.any(axis=1), not_null.any(axis=0)]
     
     # Apply demography-specific cleaning if year provided
     if year:
@@ -160,20 +192,13 @@ def clean_dataframe(df: pd.DataFrame, year: Optional[int] = None) -> pd.DataFram
                 new_columns.append(clean_name or f'unnamed_column_{len(new_columns)}')
         df.columns = new_columns
     
-    # Remove rows that appear to be subtotals or aggregates
-    if len(df.columns) > 0:
-        first_col = df.columns[0]
-        df = df[~df[first_col].astype(str).str.lower().str.contains('total|suma|agregado', na=False)]
-    
+    # Subtotal/aggregate rows are filtered out in the dbt staging model, after loading
     return df
 
 
 def _clean_column_name(name: str) -> str:
     """Clean individual column name by removing special characters."""
-    clean_name = name.replace(' ', '_').replace('/', '_').replace('-', '_')
-    clean_name = clean_name.replace('(', '').replace(')', '').replace('.', '').replace(',', '')
-    # Remove any remaining special characters
-    clean_name = ''.join(c for c in clean_name if c.isalnum() or c == '_')
+    clean_name = _NON_WORD_PATTERN.sub('', name.translate(_SEPARATOR_TABLE))
     # Ensure it doesn't start with a number
     if clean_name and clean_name[0].isdigit():
         clean_name = 'col_' + clean_name
@@ -182,31 +207,36 @@ def _clean_column_name(name: str) -> str:
 
 def _handle_duplicate_columns(columns: list) -> list:
     """Handle duplicate column names by adding numeric suffixes."""
-    seen = {}
+    # Most INE files have unique headers; return them as-is
+    if len(set(columns)) == len(columns):
+        return columns
+    seen = Counter()
     final_columns = []
     for col in columns:
-        if col in seen:
-            seen[col] += 1
-            final_columns.append(f"{col}_{seen[col]}")
-        else:
-            seen[col] = 0
-            final_columns.append(col)
+        occurrence = seen[col]
+        seen[col] += 1
+        final_columns.append(col if occurrence == 0 else f"{col}_{occurrence}")
     return final_columns
 
 
 def _standardize_data_types(df: pd.DataFrame) -> pd.DataFrame:
     """Standardize data types for consistency across years."""
-    # Convert province codes to strings (zero-padded to 2 digits)
-    if 'province_code' in df.columns:
-        df['province_code'] = df['province_code'].astype(str).str.zfill(2)
-    
-    # Convert municipality codes to strings (zero-padded to 5 digits)
-    if 'municipality_code' in df.columns:
-        df['municipality_code'] = df['municipality_code'].astype(str).str.zfill(5)
+    # Collect the converted columns and write them back in a single assign
+    updates = {}
+    
+    # Convert codes to zero-padded strings (province: 2 digits, municipality: 5 digits)
+    for code_column, width in (('province_code', 2), ('municipality_code', 5)):
+        if code_column in df.columns:
+            codes = df[code_column]
+            if pd.api.types.is_integer_dtype(codes):
+                # Nullable integer codes (blank cells) stay null instead of reaching the formatter
+                updates[code_column] = codes.map(f"{{:0{width}d}}".format, na_action='ignore')
+            else:
+                updates[code_column] = codes.astype("string[pyarrow]").str.zfill(width)
     
-    # Ensure population columns are numeric
+    # Ensure population columns are numeric, skipping columns that already are
     for col in df.columns:
-        if 'population' in col:
-            df[col] = pd.to_numeric(df[col], errors='coerce')
+        if 'population' in col and not pd.api.types.is_numeric_dtype(df[col]):
+            updates[col] = pd.to_numeric(df[col], errors='coerce', downcast='integer')
     
-    return df
\ No newline at end of file
+    return df.assign(**updates) if updates else df
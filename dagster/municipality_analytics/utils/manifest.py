@@ -0,0 +1,200 @@
+"""
+Manifest utilities for municipality analytics pipeline.
+
+Contains helpers for:
+- Atomic JSON sidecar writes (tmp file + os.replace)
+- Sidecar filenames for SEPE fingerprints and listing page validators
+- Building and loading the SEPE clean-data manifest, so downstream
+  assets can read file coverage without re-opening every data file
+"""
+
+import hashlib
+import json
+import os
+from pathlib import Path
+from typing import Any, Dict, Optional
+
+
+SEPE_MANIFEST_FILENAME = ".manifest.json"
+SEPE_FINGERPRINTS_FILENAME = ".fingerprints.json"
+SEPE_LISTING_VALIDATORS_FILENAME = ".listing_validators.json"
+SEPE_DATA_TYPES = ("unemployment", "contracts")
+SEPE_CLEAN_SUFFIXES = (".parquet", ".csv")  # In order of preference
+
+
+def write_json_atomic(path: Path, payload: Any) -> None:
+    """
+    Write JSON to path atomically so readers never see a partial file.
+
+    Args:
+        path: Destination file path
+        payload: JSON-serializable object
+    """
+    path = Path(path)
+    tmp_path = path.with_name(f"{path.name}.tmp")
+    with open(tmp_path, 'w', encoding='utf-8') as f:
+        json.dump(payload, f)
+    os.replace(tmp_path, path)
+
+
+def load_json(path: Path) -> Optional[Any]:
+    """Load a JSON sidecar, returning None if it is missing or unreadable."""
+    try:
+        with open(path, 'r', encoding='utf-8') as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return None
+
+
+def _sha256_prefix(path: Path, length: int = 8) -> str:
+    """Short content hash of a file, read in 1MB blocks."""
+    digest = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for block in iter(lambda: f.read(1 << 20), b''):
+            digest.update(block)
+    return digest.hexdigest()[:length]
+
+
+def _parse_sepe_filename(filename: str) -> Optional[tuple]:
+    """Parse a consolidated SEPE filename (YEAR_MONTH_TYPE.parquet/.csv) into (year, month, type)."""
+    parts = Path(filename).stem.split('_')
+    if len(parts) < 3 or parts[2] not in SEPE_DATA_TYPES:
+        return None
+    try:
+        return int(parts[0]), int(parts[1]), parts[2]
+    except ValueError:
+        return None
+
+
+def _read_province_column(path: str):
+    """Read only the province column, skipping every other column at parse time."""
+    if path.endswith('.parquet'):
+        import pyarrow as pa
+        import pyarrow.parquet as pq
+        column = pq.read_table(path, columns=['province']).column('province')
+        # Categorical provinces are dictionary-encoded; decode so values compare as plain strings
+        return column.cast(column.type.value_type) if pa.types.is_dictionary(column.type) else column
+    import pyarrow.csv as pv
+    table = pv.read_csv(
+        path,
+        read_options=pv.ReadOptions(block_size=1 << 20),
+        convert_options=pv.ConvertOptions(include_columns=['province'])
+    )
+    return table.column('province')
+
+
+def _count_rows(path: str) -> int:
+    """Row count of a consolidated file without parsing its values."""
+    if path.endswith('.parquet'):
+        import pyarrow.parquet as pq
+        return pq.read_metadata(path).num_rows
+    with open(path, 'rb') as f:
+        return max(sum(1 for _ in f) - 1, 0)  # Minus the header line
+
+
+def build_sepe_manifest(clean_dir: Path, previous: Optional[Dict] = None) -> Dict:
+    """
+    Build a manifest describing every consolidated SEPE file in clean_dir.
+
+    Entries from a previous manifest are reused when the file's mtime and
+    size are unchanged, so only new or modified files are read, and the
+    province column is read from one file per month. When a month has both a
+    Parquet and a legacy CSV file, only the Parquet one is listed.
+
+    Args:
+        clean_dir: Directory holding the consolidated SEPE files
+        previous: Previously written manifest, if any
+
+    Returns:
+        Manifest dictionary keyed by filename
+    """
+    import pyarrow.compute as pc
+
+    clean_dir = Path(clean_dir)
+    previous_files = (previous or {}).get('files', {})
+
+    # Pick one file per YEAR_MONTH_TYPE stem, preferring Parquet
+    candidates = {}
+    with os.scandir(clean_dir) as entries:
+        for entry in entries:
+            suffix = os.path.splitext(entry.name)[1]
+            if suffix not in SEPE_CLEAN_SUFFIXES or _parse_sepe_filename(entry.name) is None:
+                continue
+            stem = entry.name[:-len(suffix)]
+            current = candidates.get(stem)
+            if current is None or SEPE_CLEAN_SUFFIXES.index(suffix) < SEPE_CLEAN_SUFFIXES.index(os.path.splitext(current.name)[1]):
+                candidates[stem] = entry
+
+    # Filename-only pass: reuse unchanged entries and group the rest by month
+    files = {}
+    pending_by_month = {}
+    for entry in candidates.values():
+        year, month, data_type = _parse_sepe_filename(entry.name)
+        st = entry.stat()
+        cached = previous_files.get(entry.name)
+        if cached and cached.get('mtime') == st.st_mtime_ns and cached.get('size') == st.st_size:
+            files[entry.name] = cached
+            continue
+        pending_by_month.setdefault((year, month), []).append((entry, data_type, st))
+
+    # The unemployment and contracts files of a month cover the same provinces,
+    # so the province column is read from one file per month only
+    for (year, month), month_entries in pending_by_month.items():
+        provinces = None
+        for entry, data_type, st in month_entries:
+            if provinces is None:
+                province_column = _read_province_column(entry.path)
+                provinces = sorted(pc.unique(province_column.drop_null()).to_pylist())
+                rows = len(province_column)
+            else:
+                rows = _count_rows(entry.path)
+            files[entry.name] = {
+                'year': year,
+                'month': month,
+                'type': data_type,
+                'provinces': provinces,
+                'rows': rows,
+                'mtime': st.st_mtime_ns,
+                'size': st.st_size,
+                'sha256_8': _sha256_prefix(Path(entry.path))
+            }
+
+    return {'version': 1, 'files': files}
+
+
+def write_sepe_manifest(clean_dir: Path) -> Dict:
+    """
+    Rebuild and atomically write the SEPE manifest for clean_dir.
+
+    The manifest mtime is bumped after the rename so that it is never older
+    than the directory entry update caused by writing it.
+
+    Returns:
+        The manifest that was written
+    """
+    clean_dir = Path(clean_dir)
+    manifest_path = clean_dir / SEPE_MANIFEST_FILENAME
+    manifest = build_sepe_manifest(clean_dir, previous=load_json(manifest_path))
+    write_json_atomic(manifest_path, manifest)
+    os.utime(manifest_path)
+    return manifest
+
+
+def load_sepe_manifest(clean_dir: Path) -> Optional[Dict]:
+    """
+    Load the SEPE manifest if it is present and fresh.
+
+    The manifest is considered stale when clean_dir has been modified
+    (files added, removed or renamed) after the manifest was written.
+
+    Returns:
+        Manifest dictionary, or None if missing or stale
+    """
+    clean_dir = Path(clean_dir)
+    manifest_path = clean_dir / SEPE_MANIFEST_FILENAME
+    try:
+        if clean_dir.stat().st_mtime_ns > manifest_path.stat().st_mtime_ns:
+            return None
+    except OSError:
+        return None
+    return load_json(manifest_path)
@@ -3,30 +3,203 @@ SEPE Data Cleaner Utility
 Extracts unemployment and contract data from complex multi-sheet SEPE Excel files
 """
 
+import numpy as np
 import pandas as pd
+import pyarrow as pa
+import pyarrow.csv as pv
+import pyarrow.parquet as pq
 import os
 import re
 from pathlib import Path
-from typing import Dict, List, Tuple, Optional
+from typing import Dict, List, Set, Tuple, Optional
 import logging
-from concurrent.futures import ThreadPoolExecutor, ProcessPoolExecutor, as_completed
+from dataclasses import dataclass
+from concurrent.futures import ProcessPoolExecutor, as_completed
 import multiprocessing as mp
 from functools import lru_cache
 import time
-import openpyxl
+import importlib.util
+
+# Linear-time RE2 matching for the per-row header filter when google-re2 is installed
+try:
+    import re2 as _regex_engine
+except ImportError:
+    _regex_engine = re
+
+from .manifest import SEPE_FINGERPRINTS_FILENAME, load_json, write_json_atomic
+
+
+# Explicit dtypes for the consolidated output; every other column is a count.
+# province and data_type repeat across rows, so they are stored as categories (dictionary-encoded in Parquet)
+SEPE_OUTPUT_DTYPES = {
+    'municipality_code': 'int32',  # INE codes have at most 5 digits
+    'municipality_name': 'string',
+    'province': 'category',
+    'year': 'int16',
+    'month': 'int8',
+    'data_type': 'category'
+}
+SEPE_COUNT_DTYPE = 'int32'
+# Cover, index and unassigned-municipality sheets carry no province data
+SEPE_SKIP_SHEETS = frozenset({'PORTADA', 'Indice', 'NO CONSTA MUNIC.'})
+# Column-label rows that look like municipality names in OLD-format sheets
+OLD_FORMAT_LABEL_ROWS = frozenset({'TOTAL', 'HOMBRES', 'MUJERES', 'MUNICIPIOS'})
+# Upper bound on rows read per province sheet: headers plus every municipality in Spain (~8,130),
+# so readers that stream rows (openpyxl read-only) stop early on sheets padded with trailing rows
+SEPE_MAX_SHEET_ROWS = 8_200
+# Rows per Parquet row group; a monthly file (every municipality) fits in one
+SEPE_PARQUET_ROW_GROUP_SIZE = 200_000
+
+# Rows per batch handed to Arrow's CSV writer (its default of 1024 adds per-batch overhead)
+SEPE_CSV_WRITE_BATCH_ROWS = 64_000
+# Minimum seconds between progress lines while files complete
+SEPE_PROGRESS_LOG_INTERVAL = 10.0
+
+# Counters tracked in SepeDataCleaner.processing_stats (merged from workers by name)
+SEPE_PROCESSING_STATS = (
+    'files_processed',
+    'files_failed',
+    'sheets_processed',
+    'sheets_failed',
+    'engine_fallbacks',
+    'data_quality_issues',
+    'old_format_files',
+    'new_format_files',
+    'xls_files_found',
+    'files_skipped',
+    'parse_cache_hits',
+)
+
+# Parsed-sheet cache directory under the output dir; bump the version when parsing changes
+SEPE_PARSE_CACHE_DIR = '.cache/parsed_v1'
+
+
+def _clean_numeric_block(df: pd.DataFrame, columns: List[str], strip_pattern: str) -> pd.DataFrame:
+    """
+    Parse the count columns as SEPE_COUNT_DTYPE, stripping strip_pattern from text cells
+    
+    Most cells already arrive as numbers from the Excel reader, so only the cells
+    that fail numeric parsing (e.g. "<5") go through string cleaning; fully
+    numeric columns are passed through untouched. The remaining mixed columns
+    are flattened into one array and parsed in a single pass. Unparseable
+    values become 0.
+    """
+    parsed = {}
+    mixed_columns = []
+    for col in columns:
+        if pd.api.types.is_numeric_dtype(df[col]):
+            parsed[col] = df[col].to_numpy()
+        else:
+            mixed_columns.append(col)
+    
+    if mixed_columns:
+        values = pd.Series(df[mixed_columns].to_numpy(dtype=object).ravel())
+        numbers = pd.to_numeric(values, errors='coerce')
+        text_cells = numbers.isna() & values.notna()
+        if text_cells.any():
+            numbers[text_cells] = pd.to_numeric(
+                values[text_cells].astype(str).str.replace(strip_pattern, '', regex=True),
+                errors='coerce'
+            )
+        # ravel() is row-major, so each column of the reshaped block is one input column
+        block = numbers.to_numpy(dtype='float64').reshape(len(df), len(mixed_columns))
+        parsed.update(zip(mixed_columns, block.T))
+    
+    return pd.DataFrame({col: parsed[col] for col in columns}, index=df.index).fillna(0).astype(SEPE_COUNT_DTYPE)
+
+
+def _new_processing_stats() -> Dict[str, int]:
+    """Zeroed processing counters; shared by __init__ and each clean_all_files run"""
+    return {stat: 0 for stat in SEPE_PROCESSING_STATS}
+
+
+@dataclass(frozen=True)
+class SheetSchema:
+    """Column layout of one SEPE data type across the sheet formats"""
+    data_type: str
+    columns: Tuple[str, ...]  # NEW format (2013+) and the final output layout
+    numeric_strip: str  # Characters stripped from count cells before parsing
+    old_extra_columns_until_2007: Tuple[str, ...] = ()  # Trailing columns only in 2005-2007 sheets
+    
+    def old_columns(self, year: int) -> List[str]:
+        """OLD format (<= 2012) layout: a leading empty column instead of the municipality code"""
+        extra = self.old_extra_columns_until_2007 if year <= 2007 else ()
+        return ['temp_col_0', *self.columns[1:], *extra]
+
+
+UNEMPLOYMENT_SCHEMA = SheetSchema(
+    data_type='unemployment',
+    columns=(
+        'municipality_code',
+        'municipality_name',
+        'total_unemployment',
+        'men_under_25',
+        'men_25_44',
+        'men_45_plus',
+        'women_under_25',
+        'women_25_44',
+        'women_45_plus',
+        'agriculture_sector',
+        'industry_sector',
+        'construction_sector',
+        'services_sector',
+        'no_previous_employment'
+    ),
+    numeric_strip=r'[<>]',  # Special values like "<5" lose their markers
+    old_extra_columns_until_2007=('extra_col_1', 'extra_col_2', 'extra_col_3')
+)
+
+CONTRACTS_SCHEMA = SheetSchema(
+    data_type='contracts',
+    columns=(
+        'municipality_code',
+        'municipality_name',
+        'total_contracts',
+        'men_indefinite_initial',
+        'men_temporary_initial',
+        'men_indefinite_conversion',
+        'women_indefinite_initial',
+        'women_temporary_initial',
+        'women_indefinite_conversion',
+        'agriculture_sector',
+        'industry_sector',
+        'construction_sector',
+        'services_sector'
+    ),
+    numeric_strip=r'[ <>]'  # Spaces and special value markers are stripped; blanks become 0
+)
+
+# Columns of a parsed sheet that are not counts
+SHEET_NON_COUNT_COLUMNS = frozenset({'municipality_code', 'municipality_name', 'province', 'year', 'month', 'data_type'})
+
 
 class SepeDataCleaner:
     """
     Cleans and processes SEPE unemployment and contract data from Excel files
     """
     
-    def __init__(self, input_dir: str = "/opt/dagster/raw/sepe", output_dir: str = "/opt/dagster/clean/sepe", force_reprocess: bool = False, max_workers: int = None):
+    def __init__(self, input_dir: str = "/opt/dagster/raw/sepe", output_dir: str = "/opt/dagster/clean/sepe", force_reprocess: bool = False, max_workers: int = None, excel_engine: str = 'calamine', output_format: str = 'parquet', sheet_workers: int = 1):
         self.input_dir = Path(input_dir)
         self.output_dir = Path(output_dir)
         self.force_reprocess = force_reprocess
         self.max_workers = max_workers or min(4, mp.cpu_count())  # Limit to avoid memory issues
+        # Processes splitting the sheets of one file; >1 only when there are spare cores
+        self.sheet_workers = max(1, sheet_workers)
+        if output_format not in ('parquet', 'csv'):
+            raise ValueError(f"Unsupported output format: {output_format}")
+        self.output_format = output_format
+        self.output_suffix = f".{output_format}"
         self.output_dir.mkdir(parents=True, exist_ok=True)
         
+        # Setup logger
+        self.logger = logging.getLogger(__name__)
+        
+        # Excel engine (python-calamine by default); None means suffix-based openpyxl/xlrd fallback
+        if excel_engine == 'calamine' and importlib.util.find_spec('python_calamine') is None:
+            self.logger.warning("python-calamine is not installed, falling back to openpyxl/xlrd")
+            excel_engine = None
+        self.excel_engine = excel_engine
+        
         # Spanish province name mappings (for consistency)
         self.province_mappings = {
             'A CORUÑA': 'CORUÑA',
@@ -35,33 +208,31 @@ class SepeDataCleaner:
             'STA. CRUZ TENER.': 'SANTA CRUZ TENERIFE',
             'CONTRTOS LUGO': 'CONTRATOS LUGO'  # Fix typo in sheet name
         }
+        # All mappings in one alternation (longest first) so each sheet name is scanned once
+        self.province_mappings_pattern = re.compile('|'.join(
+            re.escape(old_name) for old_name in sorted(self.province_mappings, key=len, reverse=True)
+        ))
         
         # Pre-compiled regex for better performance
-        self.header_keywords_pattern = re.compile(
-            r'PARO REGISTRADO|SEGÚN SEXO|EDAD Y SECTOR|MUNICIPIOS|TOTAL|HOMBRES|MUJERES|'
-            r'SECTORES|AGRI-|INDUS-|CONS-|CONTRATOS DE TRABAJO|REGISTRADOS SEGÚN|'
-            r'TIPO DE CONTRATO|INIC\. INDEF\.|INIC\. TEMPORAL|CONVERT\.', 
-            re.IGNORECASE
+        # Case-insensitive via the inline flag so the same pattern compiles with re2 or re.
+        # Keywords sharing a prefix are factored into one branch (a hand-built trie), so the
+        # backtracking re fallback tries each prefix once instead of once per keyword
+        self.header_keywords_pattern = _regex_engine.compile(
+            r'(?i)PARO REGISTRADO|S(?:EGÚN SEXO|ECTORES)|EDAD Y SECTOR|MU(?:NICIPIOS|JERES)|'
+            r'T(?:OTAL|IPO DE CONTRATO)|HOMBRES|AGRI-|IN(?:DUS-|IC\. (?:INDEF\.|TEMPORAL))|'
+            r'CON(?:S-|TRATOS DE TRABAJO|VERT\.)|REGISTRADOS SEGÚN'
         )
         
-        # Cache for format detection results
-        self._format_cache = {}
-        
-        # Setup logger
-        self.logger = logging.getLogger(__name__)
+        # (mtime_ns, size) fingerprints of XLS files already converted
+        self.fingerprints_file = self.output_dir / SEPE_FINGERPRINTS_FILENAME
+        self._fingerprints = self._load_fingerprints()
         
         # Error tracking and logging
         self.error_log_file = self.output_dir / 'processing_errors.log'
-        self.processing_stats = {
-            'files_processed': 0,
-            'files_failed': 0,
-            'sheets_processed': 0,
-            'sheets_failed': 0,
-            'engine_fallbacks': 0,
-            'data_quality_issues': 0,
-            'old_format_files': 0,
-            'new_format_files': 0
-        }
+        self.processing_stats = _new_processing_stats()
+        
+        # Parsed per-file results, reused when an unchanged XLS has to be consolidated again
+        self.parse_cache_dir = self.output_dir / SEPE_PARSE_CACHE_DIR
     
     def log_error(self, error_type: str, file_name: str, sheet_name: str = None, error_message: str = None):
         """Log errors to both console and error log file"""
@@ -99,9 +270,9 @@ class SepeDataCleaner:
         sheet_name = sheet_name.strip()
         
         # Apply mappings for known inconsistencies
-        for old_name, new_name in self.province_mappings.items():
-            if old_name in sheet_name:
-                sheet_name = sheet_name.replace(old_name, new_name)
+        sheet_name = self.province_mappings_pattern.sub(
+            lambda match: self.province_mappings[match.group(0)], sheet_name
+        )
         
         if sheet_name.startswith('PARO '):
             return 'unemployment', sheet_name[5:], sheet_name[5:].strip()
@@ -110,6 +281,17 @@ class SepeDataCleaner:
         else:
             return 'unknown', sheet_name, sheet_name
     
+    def drop_header_rows(self, data_df: pd.DataFrame, province: str) -> pd.DataFrame:
+        """Drop OLD-format rows whose name column is a repeated header or the province total"""
+        province_lower = province.lower()
+        header_search = self.header_keywords_pattern.search
+        # One plain Python pass over the names; cheaper than two .str.contains over object dtype
+        keep = [
+            not (header_search(name) or province_lower in name.lower())
+            for name in map(str, data_df.iloc[:, 1].tolist())
+        ]
+        return data_df[keep]
+    
     def normalize_province_name(self, province: str) -> str:
         """Normalize province name for consistent file naming"""
         # Replace spaces and special characters for file naming
@@ -146,8 +328,8 @@ class SepeDataCleaner:
             if missing_names > 0:
                 issues.append(f"{missing_names} missing municipality names")
         
-        # Check for negative values in numeric columns
-        numeric_cols = df.select_dtypes(include=['int64', 'float64']).columns
+        # Check for negative values in numeric columns (counts are already int32 by now)
+        numeric_cols = df.select_dtypes('number').columns
         for col in numeric_cols:
             if col not in ['municipality_code', 'year', 'month']:
                 negative_count = (df[col] < 0).sum()
@@ -182,12 +364,8 @@ class SepeDataCleaner:
         Optimized format detection and data start row finding
         Returns: (format_type, data_start_row, has_codes)
         """
+        # The format depends only on the year (cached); the data start row is scanned per sheet
         format_type = self.get_format_by_year(year)
-        cache_key = f"{year}_{format_type}_{province}"
-        
-        # Check cache first
-        if cache_key in self._format_cache:
-            return self._format_cache[cache_key]
         
         if format_type == 'OLD':
             # Optimized search for OLD format - check first 50 rows only
@@ -196,10 +374,11 @@ class SepeDataCleaner:
             # Vectorized operation to find municipality names
             if len(search_df.columns) > 1:
                 col1_values = search_df.iloc[:, 1].dropna()
+                col1_text = col1_values.astype(str)  # Converted once, shared by every mask
                 # Filter string values with length > 3
-                string_mask = col1_values.astype(str).str.len() > 3
-                alpha_mask = col1_values.astype(str).str.contains(r'[a-zA-Z]', na=False)
-                exclude_mask = ~col1_values.astype(str).str.upper().isin(['TOTAL', 'HOMBRES', 'MUJERES', 'MUNICIPIOS'])
+                string_mask = col1_text.str.len() > 3
+                alpha_mask = col1_text.str.contains(r'[a-zA-Z]', na=False)
+                exclude_mask = ~col1_text.str.upper().isin(OLD_FORMAT_LABEL_ROWS)
                 
                 valid_indices = col1_values[string_mask & alpha_mask & exclude_mask].index
                 
@@ -226,229 +405,46 @@ class SepeDataCleaner:
             else:
                 result = ('NEW', None, True)
         
-        # Cache the result
-        self._format_cache[cache_key] = result
         return result
     
     def parse_unemployment_sheet(self, df: pd.DataFrame, province: str, year: int, month: int) -> pd.DataFrame:
         """Parse unemployment data sheet structure"""
-        self.logger.info(f"Parsing unemployment sheet for {province} (year {year}) - shape: {df.shape}")
-        
-        # Detect format and find data start
-        format_type, data_start_row, has_codes = self.detect_format_and_data_start(df, province, year)
-        
-        if data_start_row is None:
-            self.logger.warning(f"No data found in unemployment sheet for {province} ({format_type} format)")
-            return pd.DataFrame()
-        
-        self.logger.info(f"Using {format_type} format, data starts at row {data_start_row}")
-        
-        # Extract data rows
-        data_df = df.iloc[data_start_row:].copy()
-        
-        if format_type == 'NEW':
-            # NEW FORMAT: Has municipality codes in column 0
-            # Remove rows with NaN municipality codes
-            data_df = data_df[pd.notna(data_df.iloc[:, 0])]
-            
-            unemployment_columns = [
-                'municipality_code',
-                'municipality_name', 
-                'total_unemployment',
-                'men_under_25',
-                'men_25_44',
-                'men_45_plus',
-                'women_under_25',
-                'women_25_44', 
-                'women_45_plus',
-                'agriculture_sector',
-                'industry_sector',
-                'construction_sector',
-                'services_sector',
-                'no_previous_employment'
-            ]
-            
-            # Ensure we have the right number of columns
-            if len(data_df.columns) >= len(unemployment_columns):
-                data_df = data_df.iloc[:, :len(unemployment_columns)]
-                data_df.columns = unemployment_columns
-            else:
-                self.logger.warning(f"Unexpected column count in {province} unemployment data (NEW format)")
-                return pd.DataFrame()
-                
-        else:  # OLD FORMAT
-            # OLD FORMAT: No municipality codes, different column structure
-            # Remove rows with NaN municipality names and filter out header rows
-            data_df = data_df[pd.notna(data_df.iloc[:, 1])]
-            data_df = data_df[data_df.iloc[:, 1].astype(str).str.len() > 3]  # Filter out short strings
-            
-            # Optimized header filtering using pre-compiled regex
-            if len(data_df) > 0 and len(data_df.columns) > 1:
-                municipality_names = data_df.iloc[:, 1].astype(str)
-                # Single regex operation instead of multiple loops
-                header_mask = municipality_names.str.contains(self.header_keywords_pattern, na=False)
-                province_mask = municipality_names.str.contains(province, case=False, na=False)
-                data_df = data_df[~(header_mask | province_mask)]
-            
-            if year <= 2007:
-                # Very old format (2005-2007) with 17 columns
-                unemployment_columns_old = [
-                    'temp_col_0',  # Empty column in old format
-                    'municipality_name',
-                    'total_unemployment',
-                    'men_under_25',
-                    'men_25_44', 
-                    'men_45_plus',
-                    'women_under_25',
-                    'women_25_44',
-                    'women_45_plus',
-                    'agriculture_sector',
-                    'industry_sector',
-                    'construction_sector',
-                    'services_sector',
-                    'no_previous_employment',
-                    'extra_col_1',
-                    'extra_col_2',
-                    'extra_col_3'
-                ]
-            else:
-                # Intermediate old format (2008-2012) with 14 columns
-                unemployment_columns_old = [
-                    'temp_col_0',
-                    'municipality_name',
-                    'total_unemployment',
-                    'men_under_25',
-                    'men_25_44',
-                    'men_45_plus', 
-                    'women_under_25',
-                    'women_25_44',
-                    'women_45_plus',
-                    'agriculture_sector',
-                    'industry_sector',
-                    'construction_sector',
-                    'services_sector',
-                    'no_previous_employment'
-                ]
-            
-            # Apply column names with flexible handling
-            actual_columns = len(data_df.columns)
-            expected_columns = len(unemployment_columns_old)
-            
-            if actual_columns < expected_columns:
-                self.logger.warning(f"Not enough columns in {province} unemployment data (OLD format): "
-                                  f"got {actual_columns}, expected {expected_columns}")
-                # Use only the columns we have
-                available_columns = unemployment_columns_old[:actual_columns]
-                data_df.columns = available_columns
-            else:
-                # Use expected columns, truncate if more
-                data_df = data_df.iloc[:, :expected_columns]
-                data_df.columns = unemployment_columns_old
-                
-            self.logger.info(f"Processed {province} unemployment data (OLD format): "
-                           f"{actual_columns} columns -> {len(data_df.columns)} columns")
-            
-            # Generate municipality codes (placeholder for now - could be enhanced with lookup)
-            data_df['municipality_code'] = 0  # Placeholder
-            
-            # Reorganize columns to match NEW format - flexible handling
-            final_columns = [
-                'municipality_code',
-                'municipality_name', 
-                'total_unemployment',
-                'men_under_25',
-                'men_25_44',
-                'men_45_plus',
-                'women_under_25',
-                'women_25_44', 
-                'women_45_plus',
-                'agriculture_sector',
-                'industry_sector',
-                'construction_sector',
-                'services_sector',
-                'no_previous_employment'
-            ]
-            
-            # Build column list based on what's actually available
-            available_columns = ['municipality_code', 'municipality_name']
-            for col in unemployment_columns_old[2:]:
-                if col in data_df.columns and col in final_columns:
-                    available_columns.append(col)
-            
-            data_df = data_df[available_columns]
-        
-        # Add metadata columns
-        data_df['province'] = province
-        data_df['year'] = year
-        data_df['month'] = month
-        data_df['data_type'] = 'unemployment'
-        
-        # Optimized data type cleaning - vectorized operations
-        numeric_columns = [col for col in data_df.columns 
-                          if col not in ['municipality_name', 'province', 'year', 'month', 'data_type']]
-        
-        if numeric_columns:
-            # Vectorized string cleaning for all numeric columns at once
-            for col in numeric_columns:
-                if col != 'municipality_code':  # Skip municipality_code for old format with placeholders
-                    # Single vectorized operation for special value handling
-                    data_df[col] = pd.to_numeric(
-                        data_df[col].astype(str).str.replace(r'[<>]', '', regex=True),
-                        errors='coerce'
-                    ).fillna(0)
-        
-        # Clean municipality code and name
-        if format_type == 'NEW':
-            data_df['municipality_code'] = data_df['municipality_code'].astype(int)
-        # For OLD format, municipality_code is already 0 (placeholder)
-        
-        data_df['municipality_name'] = data_df['municipality_name'].astype(str).str.strip()
-        
-        return data_df
+        return self.parse_sheet(df, UNEMPLOYMENT_SCHEMA, province, year, month)
     
     def parse_contracts_sheet(self, df: pd.DataFrame, province: str, year: int, month: int) -> pd.DataFrame:
         """Parse contracts data sheet structure"""
-        self.logger.info(f"Parsing contracts sheet for {province} (year {year}) - shape: {df.shape}")
+        return self.parse_sheet(df, CONTRACTS_SCHEMA, province, year, month)
+    
+    def parse_sheet(self, df: pd.DataFrame, schema: 'SheetSchema', province: str, year: int, month: int) -> pd.DataFrame:
+        """Parse a province sheet of either data type, driven by its SheetSchema"""
+        data_type = schema.data_type
+        # Per-sheet messages use lazy %-args so nothing is formatted when INFO is filtered out
+        self.logger.info("Parsing %s sheet for %s (year %d) - shape: %s", data_type, province, year, df.shape)
         
-        # Use the same format detection logic
+        # Detect format and find data start
         format_type, data_start_row, has_codes = self.detect_format_and_data_start(df, province, year)
         
         if data_start_row is None:
-            self.logger.warning(f"No data found in contracts sheet for {province} ({format_type} format)")
+            self.logger.warning(f"No data found in {data_type} sheet for {province} ({format_type} format)")
             return pd.DataFrame()
         
-        self.logger.info(f"Using {format_type} format, data starts at row {data_start_row}")
+        self.logger.info("Using %s format, data starts at row %d", format_type, data_start_row)
         
-        # Extract data rows
-        data_df = df.iloc[data_start_row:].copy()
+        # Extract data rows (no copy needed: both formats filter with a boolean mask next, which copies)
+        data_df = df.iloc[data_start_row:]
+        final_columns = list(schema.columns)
         
         if format_type == 'NEW':
             # NEW FORMAT: Has municipality codes in column 0
             # Remove rows with NaN municipality codes
             data_df = data_df[pd.notna(data_df.iloc[:, 0])]
             
-            contracts_columns = [
-                'municipality_code',
-                'municipality_name',
-                'total_contracts', 
-                'men_indefinite_initial',
-                'men_temporary_initial',
-                'men_indefinite_conversion',
-                'women_indefinite_initial',
-                'women_temporary_initial',
-                'women_indefinite_conversion',
-                'agriculture_sector',
-                'industry_sector', 
-                'construction_sector',
-                'services_sector'
-            ]
-            
             # Ensure we have the right number of columns
-            if len(data_df.columns) >= len(contracts_columns):
-                data_df = data_df.iloc[:, :len(contracts_columns)]
-                data_df.columns = contracts_columns
+            if len(data_df.columns) >= len(final_columns):
+                data_df = data_df.iloc[:, :len(final_columns)]
+                data_df.columns = final_columns
             else:
-                self.logger.warning(f"Unexpected column count in {province} contracts data (NEW format)")
+                self.logger.warning(f"Unexpected column count in {province} {data_type} data (NEW format)")
                 return pd.DataFrame()
                 
         else:  # OLD FORMAT
@@ -459,98 +455,55 @@ class SepeDataCleaner:
             
             # Optimized header filtering using pre-compiled regex
             if len(data_df) > 0 and len(data_df.columns) > 1:
-                municipality_names = data_df.iloc[:, 1].astype(str)
-                # Single regex operation instead of multiple loops
-                header_mask = municipality_names.str.contains(self.header_keywords_pattern, na=False)
-                province_mask = municipality_names.str.contains(province, case=False, na=False)
-                data_df = data_df[~(header_mask | province_mask)]
+                data_df = self.drop_header_rows(data_df, province)
             
-            # OLD format contracts should have similar structure but fewer columns
-            contracts_columns_old = [
-                'temp_col_0',
-                'municipality_name',
-                'total_contracts',
-                'men_indefinite_initial',
-                'men_temporary_initial',
-                'men_indefinite_conversion',
-                'women_indefinite_initial',
-                'women_temporary_initial',
-                'women_indefinite_conversion',
-                'agriculture_sector',
-                'industry_sector',
-                'construction_sector',
-                'services_sector'
-            ]
+            old_columns = schema.old_columns(year)
             
             # Apply column names with flexible handling
             actual_columns = len(data_df.columns)
-            expected_columns = len(contracts_columns_old)
+            expected_columns = len(old_columns)
             
             if actual_columns < expected_columns:
-                self.logger.warning(f"Not enough columns in {province} contracts data (OLD format): "
+                self.logger.warning(f"Not enough columns in {province} {data_type} data (OLD format): "
                                   f"got {actual_columns}, expected {expected_columns}")
                 # Use only the columns we have
-                available_columns = contracts_columns_old[:actual_columns]
-                data_df.columns = available_columns
+                data_df.columns = old_columns[:actual_columns]
             else:
                 # Use expected columns, truncate if more
                 data_df = data_df.iloc[:, :expected_columns]
-                data_df.columns = contracts_columns_old
+                data_df.columns = old_columns
                 
-            self.logger.info(f"Processed {province} contracts data (OLD format): "
-                           f"{actual_columns} columns -> {len(data_df.columns)} columns")
-            
-            # Generate municipality codes (placeholder)
-            data_df['municipality_code'] = 0
+            self.logger.info("Processed %s %s data (OLD format): %d columns -> %d columns",
+                             province, data_type, actual_columns, len(data_df.columns))
             
-            # Reorganize columns to match NEW format - flexible handling
-            final_columns = [
-                'municipality_code',
-                'municipality_name',
-                'total_contracts', 
-                'men_indefinite_initial',
-                'men_temporary_initial',
-                'men_indefinite_conversion',
-                'women_indefinite_initial',
-                'women_temporary_initial',
-                'women_indefinite_conversion',
-                'agriculture_sector',
-                'industry_sector', 
-                'construction_sector',
-                'services_sector'
-            ]
+            # Generate municipality codes (placeholder for now - could be enhanced with lookup)
+            data_df['municipality_code'] = 0  # Placeholder
             
-            # Build column list based on what's actually available
+            # Reorganize columns to match NEW format - keep the data columns actually present
             available_columns = ['municipality_code', 'municipality_name']
-            for col in contracts_columns_old[2:]:
-                if col in data_df.columns and col in final_columns:
-                    available_columns.append(col)
+            available_columns += [col for col in old_columns[2:]
+                                  if col in data_df.columns and col in final_columns]
             
             data_df = data_df[available_columns]
         
         # Add metadata columns
-        data_df['province'] = province
-        data_df['year'] = year
-        data_df['month'] = month
-        data_df['data_type'] = 'contracts'
-        
-        # Optimized data type cleaning - vectorized operations
-        numeric_columns = [col for col in data_df.columns 
-                          if col not in ['municipality_name', 'province', 'year', 'month', 'data_type']]
-        
-        if numeric_columns:
-            # Vectorized string cleaning for all numeric columns at once
-            for col in numeric_columns:
-                if col != 'municipality_code':  # Skip municipality_code for old format with placeholders
-                    # Single vectorized operation for space and special value handling
-                    data_df[col] = pd.to_numeric(
-                        data_df[col].astype(str).str.replace(r'[ <>]', '', regex=True).replace('', '0'),
-                        errors='coerce'
-                    ).fillna(0)
+        # Constant per sheet, so stored as single-category columns (int8 codes, not repeated strings)
+        constant_codes = np.zeros(len(data_df), dtype=np.int8)
+        data_df['province'] = pd.Categorical.from_codes(constant_codes, categories=[province])
+        data_df['year'] = np.int16(year)
+        data_df['month'] = np.int8(month)
+        data_df['data_type'] = pd.Categorical.from_codes(constant_codes, categories=[data_type])
+        
+        # Skip municipality_code for old format with placeholders
+        count_columns = [col for col in data_df.columns 
+                         if col not in SHEET_NON_COUNT_COLUMNS]
+        if count_columns:
+            data_df[count_columns] = _clean_numeric_block(data_df, count_columns, schema.numeric_strip)
         
         # Clean municipality code and name
-        if format_type == 'NEW':
-            data_df['municipality_code'] = data_df['municipality_code'].astype(int)
+        # (codes arrive as numbers from the reader; only cast when they aren't integers yet)
+        if format_type == 'NEW' and not pd.api.types.is_integer_dtype(data_df['municipality_code']):
+            data_df['municipality_code'] = data_df['municipality_code'].astype(SEPE_OUTPUT_DTYPES['municipality_code'])
         # For OLD format, municipality_code is already 0 (placeholder)
         
         data_df['municipality_name'] = data_df['municipality_name'].astype(str).str.strip()
@@ -558,32 +511,46 @@ class SepeDataCleaner:
         return data_df
     
     def get_optimal_engine(self, file_path: Path) -> str:
-        """Choose optimal Excel engine based on file type and size"""
-        # Try calamine first for both .xls and .xlsx - it's much faster (6-58x speedup)
-        try:
-            # Test if calamine can handle this file type
-            if file_path.suffix.lower() in ['.xlsx', '.xls']:
-                return 'calamine'  # Rust-based, extremely fast
-        except Exception:
-            # Fallback to traditional engines if calamine fails
-            pass
-        
-        # Fallback engines
+        """Choose Excel engine: the configured engine (calamine by default) or a suffix-based fallback"""
+        if self.excel_engine:
+            return self.excel_engine
+        return self.get_fallback_engine(file_path)
+    
+    def get_fallback_engine(self, file_path: Path) -> str:
+        """Fallback engine when the primary engine is unavailable or fails"""
         if file_path.suffix.lower() == '.xlsx':
-            return 'openpyxl'  # Slower but reliable for .xlsx
+            return 'openpyxl'  # pandas opens workbooks with read_only=True, data_only=True
         else:
             return 'xlrd'  # Required for older .xls files
     
-    def process_sheet_batch(self, file_path: Path, sheet_batch: List[str], year: int, month: int) -> Dict[str, Dict[str, pd.DataFrame]]:
-        """Process a batch of sheets in parallel with performance monitoring"""
+    def open_workbook(self, file_path: Path, engine: str) -> pd.ExcelFile:
+        """
+        Open a workbook for sheet listing and per-sheet parsing
+        
+        xlrd is opened on demand so listing sheet names doesn't parse every sheet
+        body; skipped sheets (cover, index) are never loaded. calamine and
+        openpyxl (read-only in pandas) already load sheets lazily.
+        """
+        if engine == 'xlrd':
+            return pd.ExcelFile(file_path, engine=engine, engine_kwargs={'on_demand': True})
+        return pd.ExcelFile(file_path, engine=engine)
+    
+    def process_sheet_batch(self, workbooks: Dict[str, pd.ExcelFile], file_path: Path, sheet_batch: List[str], year: int, month: int) -> Dict[str, Dict[str, pd.DataFrame]]:
+        """
+        Process a batch of sheets from workbooks that are already open
+        
+        workbooks maps engine name to an open pd.ExcelFile; it holds the primary
+        workbook and gains the fallback workbook the first time a sheet needs it,
+        so each engine parses the file at most once.
+        """
         batch_start_time = time.time()
         results = {'unemployment': {}, 'contracts': {}}
-        engine = self.get_optimal_engine(file_path)
+        engine = next(iter(workbooks))
         
         for sheet_name in sheet_batch:
             try:
                 # Skip special sheets
-                if sheet_name in ['PORTADA', 'Indice', 'NO CONSTA MUNIC.']:
+                if sheet_name in SEPE_SKIP_SHEETS:
                     continue
                 
                 data_type, province_raw, province_clean = self.clean_sheet_name(sheet_name)
@@ -593,25 +560,27 @@ class SepeDataCleaner:
                 # Optimized sheet reading with calamine engine for massive speed boost
                 sheet_read_start = time.time()
                 try:
-                    df = pd.read_excel(file_path, sheet_name=sheet_name, header=None, engine=engine)
+                    df = workbooks[engine].parse(sheet_name, header=None, nrows=SEPE_MAX_SHEET_ROWS)
                     read_time = time.time() - sheet_read_start
                     # Only log if read takes more than 0.5s
                     if read_time > 0.5:
-                        self.logger.debug(f"Sheet {sheet_name} read with {engine} in {read_time:.2f}s")
+                        self.logger.debug("Sheet %s read with %s in %.2fs", sheet_name, engine, read_time)
                 except Exception as e:
-                    # Fallback to openpyxl/xlrd if calamine fails
-                    self.log_error('ENGINE_FALLBACK', file_path.name, sheet_name, f"Calamine failed: {str(e)[:100]}")
+                    # Fallback to openpyxl/xlrd if the primary engine fails
+                    self.log_error('ENGINE_FALLBACK', file_path.name, sheet_name, f"{engine} failed: {str(e)[:100]}")
                     self.processing_stats['engine_fallbacks'] += 1
                     
-                    fallback_engine = 'openpyxl' if file_path.suffix.lower() == '.xlsx' else 'xlrd'
+                    fallback_engine = self.get_fallback_engine(file_path)
                     fallback_start = time.time()
                     try:
-                        df = pd.read_excel(file_path, sheet_name=sheet_name, header=None, engine=fallback_engine)
+                        if fallback_engine not in workbooks:
+                            workbooks[fallback_engine] = self.open_workbook(file_path, fallback_engine)
+                        df = workbooks[fallback_engine].parse(sheet_name, header=None, nrows=SEPE_MAX_SHEET_ROWS)
                         fallback_time = time.time() - fallback_start
                         self.logger.info(f"🔄 Fallback read with {fallback_engine} in {fallback_time:.2f}s")
                         engine = fallback_engine  # Update engine for logging
                     except Exception as fallback_error:
-                        self.log_error('SHEET_READ_FAILED', file_path.name, sheet_name, f"Both engines failed. Calamine: {str(e)[:50]}, {fallback_engine}: {str(fallback_error)[:50]}")
+                        self.log_error('SHEET_READ_FAILED', file_path.name, sheet_name, f"Both engines failed. {engine}: {str(e)[:50]}, {fallback_engine}: {str(fallback_error)[:50]}")
                         self.processing_stats['sheets_failed'] += 1
                         continue
                 
@@ -650,9 +619,98 @@ class SepeDataCleaner:
         self.logger.info(f"Processed {len(sheet_batch)} sheets in {batch_time:.2f}s (avg {batch_time/len(sheet_batch):.2f}s/sheet) using {engine}")
         return results
     
-    def process_file(self, file_path: Path) -> Dict[str, Dict[str, pd.DataFrame]]:
+    def process_sheets_in_parallel(self, file_path: Path, engine: str, sheet_names: List[str], year: int, month: int):
+        """
+        Parse the sheets of one file across sheet_workers processes
+        
+        Sheets are split into one contiguous batch per worker, so each worker opens
+        the workbook once. Worker stats are merged into processing_stats.
+        Yields: Dict[data_type, Dict[province, DataFrame]] per batch
+        """
+        batch_size = -(-len(sheet_names) // self.sheet_workers)
+        batches = [sheet_names[i:i + batch_size] for i in range(0, len(sheet_names), batch_size)]
+        worker_kwargs = self.worker_kwargs(sheet_workers=1)
+        with ProcessPoolExecutor(max_workers=len(batches),
+                                 initializer=_init_worker, initargs=(worker_kwargs,)) as executor:
+            futures = [executor.submit(_process_sheets_in_worker, file_path, engine, batch, year, month)
+                       for batch in batches]
+            for future in as_completed(futures):
+                batch_results, batch_stats = future.result()
+                for stat, value in batch_stats.items():
+                    self.processing_stats[stat] += value
+                yield batch_results
+    
+    def worker_kwargs(self, **overrides) -> Dict:
+        """Constructor arguments for an equivalent SepeDataCleaner in a worker process"""
+        kwargs = {
+            'input_dir': str(self.input_dir),
+            'output_dir': str(self.output_dir),
+            'force_reprocess': self.force_reprocess,
+            'max_workers': 1,
+            'excel_engine': self.excel_engine,
+            'output_format': self.output_format,
+            'sheet_workers': 1
+        }
+        kwargs.update(overrides)
+        return kwargs
+    
+    def _parse_cache_path(self, file_path: Path, data_type: str) -> Path:
+        """Cache file holding every parsed province of one data type for one XLS file"""
+        return self.parse_cache_dir / f"{file_path.stem}_{data_type}.parquet"
+    
+    def load_parse_cache(self, file_path: Path) -> Optional[Dict[str, Dict[str, pd.DataFrame]]]:
+        """
+        Parsed results cached for file_path, or None if missing or older than the XLS
+        
+        Returns the same shape as process_file: Dict[data_type, Dict[province, DataFrame]]
+        """
+        source_mtime = file_path.stat().st_mtime_ns
+        results = {}
+        for data_type in ('unemployment', 'contracts'):
+            cache_path = self._parse_cache_path(file_path, data_type)
+            try:
+                if cache_path.stat().st_mtime_ns < source_mtime:
+                    return None
+                cached_df = pd.read_parquet(cache_path)
+            except (OSError, ValueError):
+                return None
+            results[data_type] = {
+                self.normalize_province_name(str(province)): self._restore_cached_province(province_df)
+                for province, province_df in cached_df.groupby('province', sort=False, observed=True)
+            }
+        return results
+    
+    def _restore_cached_province(self, province_df: pd.DataFrame) -> pd.DataFrame:
+        """
+        Undo the column union of the combined cache frame for one province
+        
+        Short OLD-format sheets have fewer count columns; in the combined frame those
+        columns are all-NaN floats for that province, so they are dropped and the
+        remaining counts get SEPE_COUNT_DTYPE back.
+        """
+        count_columns = [col for col in province_df.columns if col not in SHEET_NON_COUNT_COLUMNS]
+        padded_columns = [col for col in count_columns if province_df[col].isna().all()]
+        province_df = province_df.drop(columns=padded_columns).reset_index(drop=True)
+        return province_df.astype({col: SEPE_COUNT_DTYPE for col in count_columns if col not in padded_columns})
+    
+    def save_parse_cache(self, file_path: Path, results: Dict[str, Dict[str, pd.DataFrame]]):
+        """Persist process_file results for file_path (one Parquet file per data type)"""
+        try:
+            self.parse_cache_dir.mkdir(parents=True, exist_ok=True)
+            for data_type in ('unemployment', 'contracts'):
+                frames = [df for df in results.get(data_type, {}).values() if not df.empty]
+                cached_df = pd.concat(frames, ignore_index=True) if frames else pd.DataFrame({'province': pd.Series(dtype='string')})
+                cache_path = self._parse_cache_path(file_path, data_type)
+                tmp_path = cache_path.with_name(cache_path.name + '.tmp')
+                cached_df.to_parquet(tmp_path, index=False, engine='pyarrow', compression='zstd', row_group_size=SEPE_PARQUET_ROW_GROUP_SIZE)
+                os.replace(tmp_path, cache_path)
+        except Exception as e:
+            self.logger.warning(f"Could not cache parsed sheets for {file_path.name}: {e}")
+    
+    def process_file(self, file_path: Path, file_date: Optional[Tuple[int, int]] = None) -> Dict[str, Dict[str, pd.DataFrame]]:
         """
         Optimized processing of a single SEPE XLS file with parallel sheet processing
+        file_date is the (year, month) already parsed from the filename, if known
         Returns: Dict[data_type, Dict[province, DataFrame]]
         """
         start_time = time.time()
@@ -660,7 +718,7 @@ class SepeDataCleaner:
         self.logger.info(f"Processing file: {file_path.name} ({file_size_mb:.1f}MB)")
         
         try:
-            year, month = self.extract_date_from_filename(file_path.name)
+            year, month = file_date or self.extract_date_from_filename(file_path.name)
             # Track format distribution
             if year <= 2012:
                 self.processing_stats['old_format_files'] += 1
@@ -671,6 +729,16 @@ class SepeDataCleaner:
             self.processing_stats['files_failed'] += 1
             return {}
         
+        # An unchanged XLS parsed before (e.g. outputs deleted or format switched) is read from the cache
+        if not self.force_reprocess:
+            cached_results = self.load_parse_cache(file_path)
+            if cached_results is not None:
+                self.logger.info(f"Using cached parse of {file_path.name}")
+                self.processing_stats['parse_cache_hits'] += 1
+                self.processing_stats['files_processed'] += 1
+                return cached_results
+        
+        sheets_failed_before = self.processing_stats['sheets_failed']
         try:
             # Quick check of file size and skip if too large
             file_size_mb = file_path.stat().st_size / (1024 * 1024)
@@ -681,21 +749,22 @@ class SepeDataCleaner:
             # Load Excel file with optimal engine (calamine for 6-58x speed boost)
             engine = self.get_optimal_engine(file_path)
             try:
-                xl_file = pd.ExcelFile(file_path, engine=engine)
+                xl_file = self.open_workbook(file_path, engine)
             except Exception as e:
-                # Fallback if calamine fails
+                # Fallback if the primary engine fails
                 self.logger.warning(f"Primary engine {engine} failed, falling back: {e}")
-                fallback_engine = 'openpyxl' if file_path.suffix.lower() == '.xlsx' else 'xlrd'
-                xl_file = pd.ExcelFile(file_path, engine=fallback_engine)
+                fallback_engine = self.get_fallback_engine(file_path)
+                xl_file = self.open_workbook(file_path, fallback_engine)
                 engine = fallback_engine
             sheet_names = xl_file.sheet_names
             
             self.logger.info(f"Found {len(sheet_names)} sheets in {file_path.name}")
             
-            # Filter relevant sheets early
+            # Filter relevant sheets early, with the same name rules the batch uses
+            # (so mapped names such as the 'CONTRTOS LUGO' typo are kept)
             relevant_sheets = [s for s in sheet_names 
-                             if s not in ['PORTADA', 'Indice', 'NO CONSTA MUNIC.'] 
-                             and ('PARO' in s or 'CONTRATOS' in s)]
+                             if s not in SEPE_SKIP_SHEETS
+                             and self.clean_sheet_name(s)[0] != 'unknown']
             
             self.logger.info(f"Processing {len(relevant_sheets)} relevant sheets")
             
@@ -704,16 +773,29 @@ class SepeDataCleaner:
             
             results = {'unemployment': {}, 'contracts': {}}
             
-            for i in range(0, len(relevant_sheets), batch_size):
-                batch = relevant_sheets[i:i + batch_size]
-                batch_results = self.process_sheet_batch(file_path, batch, year, month)
-                
-                # Merge results
-                for data_type in ['unemployment', 'contracts']:
-                    results[data_type].update(batch_results[data_type])
-                
-                # Log progress
-                self.logger.info(f"Processed batch {i//batch_size + 1}/{(len(relevant_sheets)-1)//batch_size + 1}")
+            if self.sheet_workers > 1 and len(relevant_sheets) > batch_size:
+                # Spare cores: split the sheets across processes, each re-opening the workbook once
+                xl_file.close()
+                for batch_results in self.process_sheets_in_parallel(file_path, engine, relevant_sheets, year, month):
+                    for data_type in ['unemployment', 'contracts']:
+                        results[data_type].update(batch_results[data_type])
+            else:
+                # Every sheet is parsed from the workbook opened above instead of reopening the file
+                workbooks = {engine: xl_file}
+                try:
+                    for i in range(0, len(relevant_sheets), batch_size):
+                        batch = relevant_sheets[i:i + batch_size]
+                        batch_results = self.process_sheet_batch(workbooks, file_path, batch, year, month)
+                        
+                        # Merge results
+                        for data_type in ['unemployment', 'contracts']:
+                            results[data_type].update(batch_results[data_type])
+                        
+                        # Log progress
+                        self.logger.info(f"Processed batch {i//batch_size + 1}/{(len(relevant_sheets)-1)//batch_size + 1}")
+                finally:
+                    for workbook in workbooks.values():
+                        workbook.close()
             
             processing_time = time.time() - start_time
             processing_rate = file_size_mb / processing_time if processing_time > 0 else 0
@@ -729,6 +811,10 @@ class SepeDataCleaner:
                 self.logger.info(f"   ⚡ Estimated time savings vs openpyxl: {estimated_openpyxl_time - processing_time:.1f}s ")
                 self.logger.info(f"      (Would have taken ~{estimated_openpyxl_time:.1f}s with openpyxl)")
             
+            # Only complete parses are cached, so failed sheets are retried next time
+            if self.processing_stats['sheets_failed'] == sheets_failed_before:
+                self.save_parse_cache(file_path, results)
+            
             return results
             
         except Exception as e:
@@ -739,68 +825,153 @@ class SepeDataCleaner:
             self.processing_stats['files_processed'] += 1
     
     def save_consolidated_data(self, data_type: str, all_provinces_data: Dict[str, pd.DataFrame], year: int, month: int) -> str:
-        """Save consolidated data for all provinces in a single CSV file"""
-        filename = f"{year}_{month:02d}_{data_type}.csv"
+        """Save consolidated data for all provinces in a single Parquet (or CSV) file"""
+        filename = f"{year}_{month:02d}_{data_type}{self.output_suffix}"
         file_path = self.output_dir / filename
         
-        # Check if file already exists (unless force reprocessing)
-        if file_path.exists() and not self.force_reprocess:
-            self.logger.info(f"Consolidated file already exists, skipping: {filename}")
-            return str(file_path)
-        
-        # Combine all province data into a single DataFrame
-        combined_dfs = []
+        # Convert each province to an Arrow table; concat_tables then just chains the
+        # column buffers instead of realigning indexes and dtypes like pd.concat
+        province_tables = []
         for province, df in all_provinces_data.items():
             if not df.empty:
-                combined_dfs.append(df)
-        
-        if combined_dfs:
-            consolidated_df = pd.concat(combined_dfs, ignore_index=True)
-            consolidated_df.to_csv(file_path, index=False, encoding='utf-8')
-            self.logger.info(f"Saved consolidated {data_type} data: {file_path} ({len(consolidated_df)} total records, {len(all_provinces_data)} provinces)")
+                # Counts are whole numbers (NaN already filled with 0), so store them compactly
+                df = df.astype({
+                    column: SEPE_OUTPUT_DTYPES.get(column, SEPE_COUNT_DTYPE) 
+                    for column in df.columns
+                })
+                province_tables.append(pa.Table.from_pandas(df, preserve_index=False))
+        
+        if province_tables:
+            # Short OLD-format sheets keep fewer columns; promotion unions the schemas
+            # (missing columns become nulls) like pd.concat did
+            consolidated_table = pa.concat_tables(province_tables, promote_options="default")
+            if self.output_format == 'parquet':
+                pq.write_table(consolidated_table, file_path, compression='zstd', row_group_size=SEPE_PARQUET_ROW_GROUP_SIZE)
+            else:
+                # Arrow's C++ CSV writer formats whole columns at once; category columns are
+                # decoded to their plain values first
+                pv.write_csv(consolidated_table.cast(pa.schema([
+                    pa.field(field.name, field.type.value_type if pa.types.is_dictionary(field.type) else field.type)
+                    for field in consolidated_table.schema
+                ])), file_path, write_options=pv.WriteOptions(quoting_style='needed', batch_size=SEPE_CSV_WRITE_BATCH_ROWS))
+            self.logger.info(f"Saved consolidated {data_type} data: {file_path} ({consolidated_table.num_rows} total records, {len(all_provinces_data)} provinces)")
             return str(file_path)
         else:
             self.logger.warning(f"No data to save for {data_type} {year}-{month:02d}")
             return ""
     
-    def check_file_already_processed(self, file_path: Path) -> bool:
+    def _load_fingerprints(self) -> Dict[str, Tuple[int, int]]:
         """
-        Check if consolidated CSV outputs for this XLS file already exist
+        Load the fingerprint sidecar written by the previous run
+        
+        Fingerprints recorded for a different output format are discarded so that
+        switching formats regenerates every consolidated file.
         """
+        sidecar = load_json(self.fingerprints_file) or {}
+        if sidecar.get('output_format') != self.output_format:
+            return {}
+        return {path: tuple(fingerprint) for path, fingerprint in sidecar.get('files', {}).items()}
+    
+    def _save_fingerprints(self):
+        """Atomically persist the fingerprint sidecar"""
+        write_json_atomic(self.fingerprints_file, {
+            'output_format': self.output_format,
+            'files': self._fingerprints
+        })
+    
+    def _file_fingerprint(self, file_path: Path) -> Tuple[int, int]:
+        st = file_path.stat()
+        return st.st_mtime_ns, st.st_size
+    
+    def list_existing_outputs(self) -> Set[str]:
+        """Names of the consolidated files in output_dir, from a single directory scan"""
+        with os.scandir(self.output_dir) as entries:
+            return {entry.name for entry in entries if entry.name.endswith(self.output_suffix)}
+    
+    def check_file_already_processed(self, file_path: Path, existing_outputs: Optional[Set[str]] = None) -> bool:
+        """
+        Check if this XLS file is unchanged since it was last converted
+        
+        Compares the file's (mtime_ns, size) against the fingerprint sidecar. Files
+        without a recorded fingerprint fall back to checking for the consolidated
+        outputs, and are fingerprinted if those exist. existing_outputs (from
+        list_existing_outputs) replaces the per-file exists() probes when given.
+        """
+        fingerprint = self._file_fingerprint(file_path)
+        cached = self._fingerprints.get(str(file_path))
+        if cached is not None:
+            return cached == fingerprint
+        
         try:
             year, month = self.extract_date_from_filename(file_path.name)
         except ValueError:
             return False
         
         # Check for consolidated files
-        unemployment_file = self.output_dir / f"{year}_{month:02d}_unemployment.csv"
-        contracts_file = self.output_dir / f"{year}_{month:02d}_contracts.csv"
-        
-        files_exist = unemployment_file.exists() and contracts_file.exists()
+        if existing_outputs is None:
+            existing_outputs = self.list_existing_outputs()
+        files_exist = all(f"{year}_{month:02d}_{data_type}{self.output_suffix}" in existing_outputs
+                          for data_type in ('unemployment', 'contracts'))
         
         if files_exist:
-            self.logger.info(f"File {file_path.name} already processed (consolidated CSV files found)")
+            self.logger.info(f"File {file_path.name} already processed (consolidated {self.output_format} files found)")
+            self._fingerprints[str(file_path)] = fingerprint
         
         return files_exist
 
-    def process_file_worker(self, file_path: Path) -> Tuple[Path, Dict[str, Dict[str, pd.DataFrame]]]:
-        """Worker function for parallel file processing"""
-        return file_path, self.process_file(file_path)
-    
-    def group_files_by_format(self, xls_files: List[Path]) -> Dict[str, List[Path]]:
-        """Group files by format for batch processing optimization"""
-        old_format_files = []
-        new_format_files = []
-        
+    def advise_willneed(self, file_path: Path):
+        """Ask the kernel to start reading a file ahead of parsing (no-op where unsupported)"""
+        if not hasattr(os, 'posix_fadvise'):
+            return
+        try:
+            fd = os.open(file_path, os.O_RDONLY)
+            try:
+                os.posix_fadvise(fd, 0, 0, os.POSIX_FADV_WILLNEED)
+            finally:
+                os.close(fd)
+        except OSError:
+            pass
+
+    def parse_file_dates(self, xls_files: List[Path]) -> Dict[Path, Tuple[int, int]]:
+        """(year, month) of every XLS file, parsed once; misnamed files are logged and left out"""
+        file_dates = {}
         for file_path in xls_files:
             try:
-                year, month = self.extract_date_from_filename(file_path.name)
-                if year <= 2012:
-                    old_format_files.append(file_path)
-                else:
-                    new_format_files.append(file_path)
+                file_dates[file_path] = self.extract_date_from_filename(file_path.name)
             except ValueError:
                 continue
+        return file_dates
+    
+    def find_superseded_files(self, file_dates: Dict[Path, Tuple[int, int]]) -> Set[Path]:
+        """
+        Files whose (year, month) is also covered by a newer file
+        
+        Every file is consolidated into {year}_{month}_{data_type} outputs, so two
+        workbooks for the same month would write the same paths; only the most
+        recently modified one is kept.
+        """
+        files_by_month = {}
+        for file_path, file_date in file_dates.items():
+            files_by_month.setdefault(file_date, []).append(file_path)
+        
+        superseded = set()
+        for (year, month), month_files in files_by_month.items():
+            if len(month_files) > 1:
+                month_files.sort(key=lambda path: path.stat().st_mtime_ns)
+                superseded.update(month_files[:-1])
+                self.logger.warning(f"{len(month_files)} files for {year}-{month:02d}, using {month_files[-1].name}")
+        return superseded
+    
+    def group_files_by_format(self, file_dates: Dict[Path, Tuple[int, int]]) -> Dict[str, List[Path]]:
+        """Group files (as returned by parse_file_dates) by format for batch processing optimization"""
+        old_format_files = []
+        new_format_files = []
+        
+        for file_path, (year, month) in file_dates.items():
+            if year <= 2012:
+                old_format_files.append(file_path)
+            else:
+                new_format_files.append(file_path)
         
         return {'old': old_format_files, 'new': new_format_files}
     
@@ -818,89 +989,114 @@ class SepeDataCleaner:
             f.write("=" * 80 + "\n\n")
         
         # Reset processing stats
-        self.processing_stats = {
-            'files_processed': 0,
-            'files_failed': 0,
-            'sheets_processed': 0,
-            'sheets_failed': 0,
-            'engine_fallbacks': 0,
-            'data_quality_issues': 0,
-            'old_format_files': 0,
-            'new_format_files': 0
-        }
-        
-        # Find all XLS files
-        xls_files = list(self.input_dir.glob("*.xls"))
+        self.processing_stats = _new_processing_stats()
+        
+        # Find all XLS files in a single directory scan (DirEntry caches the inode)
+        with os.scandir(self.input_dir) as entries:
+            xls_entries = [entry for entry in entries 
+                           if entry.name.endswith('.xls') and entry.is_file(follow_symlinks=False)]
+        xls_files = [Path(entry.path) for entry in xls_entries]
+        file_inodes = {Path(entry.path): entry.inode() for entry in xls_entries}
+        self.processing_stats['xls_files_found'] = len(xls_files)
         self.logger.info(f"Found {len(xls_files)} XLS files to process")
         
         if not xls_files:
             self.logger.warning("No XLS files found to process")
             return {'unemployment': [], 'contracts': []}
         
+        # Parse every filename's (year, month) once and reuse it below and in the workers
+        file_dates = self.parse_file_dates(xls_files)
+        
+        # One consolidated output per month: older duplicate workbooks are not converted
+        superseded = self.find_superseded_files(file_dates)
+        if superseded:
+            xls_files = [file_path for file_path in xls_files if file_path not in superseded]
+            for file_path in superseded:
+                del file_dates[file_path]
+        
         # Group files by format for optimized processing
-        file_groups = self.group_files_by_format(xls_files)
+        file_groups = self.group_files_by_format(file_dates)
         self.logger.info(f"File distribution: OLD format: {len(file_groups['old'])}, NEW format: {len(file_groups['new'])}")
         
         saved_files = {'unemployment': [], 'contracts': []}
         
-        # Filter files that need processing
+        # Filter files that need processing, against one scan of the output directory
+        existing_outputs = self.list_existing_outputs()
         files_to_process = []
-        for file_path in sorted(xls_files):
-            if not self.force_reprocess and self.check_file_already_processed(file_path):
+        # (no filename sort: files to process are ordered by inode below)
+        for file_path in xls_files:
+            if not self.force_reprocess and self.check_file_already_processed(file_path, existing_outputs):
                 # Add existing files to the result
-                try:
-                    year, month = self.extract_date_from_filename(file_path.name)
+                if file_path in file_dates:
+                    year, month = file_dates[file_path]
                     for data_type in ['unemployment', 'contracts']:
-                        consolidated_file = self.output_dir / f"{year}_{month:02d}_{data_type}.csv"
-                        if consolidated_file.exists():
-                            saved_files[data_type].append(str(consolidated_file))
-                except ValueError:
-                    pass
+                        consolidated_name = f"{year}_{month:02d}_{data_type}{self.output_suffix}"
+                        if consolidated_name in existing_outputs:
+                            saved_files[data_type].append(str(self.output_dir / consolidated_name))
             else:
                 files_to_process.append(file_path)
         
-        self.logger.info(f"Processing {len(files_to_process)} files (skipped {len(xls_files) - len(files_to_process)} already processed)")
+        self.processing_stats['files_skipped'] = len(xls_files) - len(files_to_process)
+        self.logger.info(f"Processing {len(files_to_process)} files (skipped {self.processing_stats['files_skipped']} already processed)")
         
         if not files_to_process:
             self.logger.info("All files already processed")
+            self._save_fingerprints()
             return saved_files
         
-        # Process files with controlled parallelism
+        # Read files in on-disk (inode) order and prefetch the next few while parsing
+        files_to_process.sort(key=file_inodes.__getitem__)
+        prefetch_depth = self.max_workers * 2
+        for file_path in files_to_process[:prefetch_depth]:
+            self.advise_willneed(file_path)
+        next_prefetch = prefetch_depth
+        
+        # Process files in worker processes; XLS parsing is CPU-bound and holds the GIL
         processed_count = 0
-        with ThreadPoolExecutor(max_workers=self.max_workers) as executor:
+        last_progress_log = start_time
+        # Workers left idle by a short file list (e.g. a monthly run) parse sheets in parallel instead
+        worker_kwargs = self.worker_kwargs(sheet_workers=self.max_workers // len(files_to_process))
+        with ProcessPoolExecutor(max_workers=self.max_workers, 
+                                 initializer=_init_worker, initargs=(worker_kwargs,)) as executor:
             # Submit all jobs
-            future_to_file = {executor.submit(self.process_file_worker, file_path): file_path 
+            future_to_file = {executor.submit(_process_file_in_worker, file_path, file_dates.get(file_path)): file_path 
                             for file_path in files_to_process}
             
             # Process results as they complete
             for future in as_completed(future_to_file):
                 file_path = future_to_file[future]
+                if next_prefetch < len(files_to_process):
+                    self.advise_willneed(files_to_process[next_prefetch])
+                    next_prefetch += 1
                 try:
-                    file_path, file_results = future.result()
+                    file_path, file_saved_files, file_stats = future.result()
                     processed_count += 1
                     
-                    if file_results:
-                        year, month = self.extract_date_from_filename(file_path.name)
-                        
-                        # Save consolidated files for each data type
-                        for data_type, provinces_data in file_results.items():
-                            if provinces_data:  # Only if we have data
-                                saved_file = self.save_consolidated_data(data_type, provinces_data, year, month)
-                                if saved_file:  # Only add if file was actually saved
-                                    saved_files[data_type].append(saved_file)
+                    # Merge the worker's counters and outputs
+                    for stat, value in file_stats.items():
+                        self.processing_stats[stat] += value
+                    for data_type, saved_file in file_saved_files.items():
+                        saved_files[data_type].append(saved_file)
                     
-                    # Log progress
-                    if processed_count % 5 == 0 or processed_count == len(files_to_process):
-                        elapsed = time.time() - start_time
+                    if file_saved_files:
+                        self._fingerprints[str(file_path)] = self._file_fingerprint(file_path)
+                    
+                    # Log progress at most every SEPE_PROGRESS_LOG_INTERVAL seconds, and at the end
+                    now = time.time()
+                    if now - last_progress_log >= SEPE_PROGRESS_LOG_INTERVAL or processed_count == len(files_to_process):
+                        last_progress_log = now
+                        elapsed = now - start_time
                         rate = processed_count / elapsed if elapsed > 0 else 0
-                        self.logger.info(f"Progress: {processed_count}/{len(files_to_process)} files "
-                                       f"({elapsed:.1f}s, {rate:.1f} files/sec)")
+                        self.logger.info("Progress: %d/%d files (%.1fs, %.1f files/sec)",
+                                         processed_count, len(files_to_process), elapsed, rate)
                         
                 except Exception as e:
                     self.log_error('FILE_PROCESSING_ERROR', file_path.name, error_message=str(e))
                     self.processing_stats['files_failed'] += 1
                     continue
         
+        self._save_fingerprints()
+        
         total_time = time.time() - start_time
         total_files_mb = sum(f.stat().st_size for f in files_to_process) / (1024 * 1024) if files_to_process else 0
         
@@ -913,8 +1109,8 @@ class SepeDataCleaner:
         self.logger.info(f"📁 Files processed: {processed_count} ({total_files_mb:.1f}MB total)")
         self.logger.info(f"📈 Overall processing rate: {avg_rate:.1f} MB/s")
         self.logger.info(f"⚡ Average time per file: {total_time/max(processed_count, 1):.1f}s")
-        self.logger.info(f"📊 Output: {len(saved_files['unemployment'])} unemployment + {len(saved_files['contracts'])} contracts CSV files")
-        self.logger.info(f"🚀 Performance engine: python-calamine (6-58x faster than openpyxl)")
+        self.logger.info(f"📊 Output: {len(saved_files['unemployment'])} unemployment + {len(saved_files['contracts'])} contracts {self.output_format} files")
+        self.logger.info(f"🚀 Performance engine: {self.excel_engine or 'openpyxl/xlrd'}")
         
         # Estimate time savings if using calamine for most files
         if processed_count > 0:
@@ -988,4 +1184,66 @@ class SepeDataCleaner:
             self.logger.warning(f"   Sheets with quality issues: {self.processing_stats['data_quality_issues']}")
             self.logger.warning(f"   Engine fallbacks: {self.processing_stats['engine_fallbacks']}")
         else:
-            self.logger.info("✅ No processing errors detected!")
\ No newline at end of file
+            self.logger.info("✅ No processing errors detected!")
+
+
+# Per-process cleaner used by clean_all_files' ProcessPoolExecutor workers
+_worker_cleaner: Optional[SepeDataCleaner] = None
+
+
+def _init_worker(cleaner_kwargs: Dict):
+    """Create one SepeDataCleaner per worker process"""
+    global _worker_cleaner
+    _worker_cleaner = SepeDataCleaner(**cleaner_kwargs)
+
+
+def _process_file_in_worker(file_path: Path, file_date: Optional[Tuple[int, int]] = None) -> Tuple[Path, Dict[str, str], Dict[str, int]]:
+    """
+    Parse one XLS file and save its consolidated files inside a worker process
+    
+    file_date is the (year, month) the parent already parsed from the filename.
+    Only the saved paths and the processing stats accumulated for this file are
+    sent back, so parsed DataFrames never cross the process boundary.
+    Returns: (file_path, {data_type: saved_file}, {stat: delta})
+    """
+    cleaner = _worker_cleaner
+    stats_before = dict(cleaner.processing_stats)
+    
+    file_results = cleaner.process_file(file_path, file_date)
+    
+    saved_files = {}
+    if file_results:
+        year, month = file_date or cleaner.extract_date_from_filename(file_path.name)
+        
+        # Save consolidated files for each data type, releasing each type's frames once written
+        for data_type in list(file_results):
+            provinces_data = file_results.pop(data_type)
+            if provinces_data:  # Only if we have data
+                saved_file = cleaner.save_consolidated_data(data_type, provinces_data, year, month)
+                if saved_file:  # Only add if file was actually saved
+                    saved_files[data_type] = saved_file
+    
+    stats = {stat: value - stats_before.get(stat, 0) 
+             for stat, value in cleaner.processing_stats.items()}
+    return file_path, saved_files, stats
+
+
+def _process_sheets_in_worker(file_path: Path, engine: str, sheet_batch: List[str], year: int, month: int) -> Tuple[Dict[str, Dict[str, pd.DataFrame]], Dict[str, int]]:
+    """
+    Parse a batch of sheets from one XLS file inside a worker process
+    
+    Returns: ({data_type: {province: DataFrame}}, {stat: delta})
+    """
+    cleaner = _worker_cleaner
+    stats_before = dict(cleaner.processing_stats)
+    
+    workbooks = {engine: cleaner.open_workbook(file_path, engine)}
+    try:
+        results = cleaner.process_sheet_batch(workbooks, file_path, sheet_batch, year, month)
+    finally:
+        for workbook in workbooks.values():
+            workbook.close()
+    
+    stats = {stat: value - stats_before.get(stat, 0) 
+             for stat, value in cleaner.processing_stats.items()}
+    return results, stats
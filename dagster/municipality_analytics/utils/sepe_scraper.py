@@ -3,9 +3,11 @@ SEPE (Servicio Público de Empleo Estatal) Web Scraper
 Extracts unemployment data by municipalities from SEPE website
 """
 
+import asyncio
+import aiofiles
+import aiohttp
 import requests
 from bs4 import BeautifulSoup
-import pandas as pd
 import os
 import time
 import logging
@@ -18,6 +20,7 @@ class SepeScraper:
     def __init__(self, base_url: str = "https://www.sepe.es", download_dir: str = "raw/sepe"):
         self.base_url = base_url
         self.download_dir = download_dir
+        self.municipios_url = f"{base_url}/HomeSepe/es/que-es-el-sepe/estadisticas/datos-estadisticos/municipios.html"
         self.session = requests.Session()
         self.session.headers.update({
             'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36'
@@ -68,10 +71,8 @@ class SepeScraper:
         """
         Extract available years and months from the main SEPE municipalities page
         """
-        main_url = f"{self.base_url}/HomeSepe/es/que-es-el-sepe/estadisticas/datos-estadisticos/municipios.html"
-        
         try:
-            response = self.session.get(main_url)
+            response = self.session.get(self.municipios_url)
             response.raise_for_status()
             soup = BeautifulSoup(response.content, 'html.parser')
             
@@ -132,6 +133,23 @@ class SepeScraper:
             self.logger.error(f"Error getting available years/months: {e}")
             return {}
     
+    def get_listing_validators(self) -> Dict[str, str]:
+        """
+        Get the ETag/Last-Modified validators of the municipalities listing page
+        
+        Returns an empty dict if the request fails or the server sends neither header.
+        """
+        try:
+            response = self.session.head(self.municipios_url, allow_redirects=True)
+            response.raise_for_status()
+        except Exception as e:
+            self.logger.warning(f"Could not fetch listing page validators: {e}")
+            return {}
+        
+        return {header: response.headers[header] 
+                for header in ('ETag', 'Last-Modified') 
+                if header in response.headers}
+    
     def get_month_page_data(self, month_url: str) -> Optional[Dict]:
         """
         Extract data from a specific month page
@@ -139,78 +157,84 @@ class SepeScraper:
         try:
             response = self.session.get(month_url)
             response.raise_for_status()
-            soup = BeautifulSoup(response.content, 'html.parser')
-            
-            # Look for "Libro completo" text and find XLS link near it
-            libro_completo_link = None
+            return self.parse_month_page(month_url, response.content)
             
-            # Method 1: Look for "Libro completo" text and find nearby XLS links
-            page_text = soup.get_text()
-            if 'libro completo' in page_text.lower():
-                # Find all XLS links on the page
-                all_xls_links = []
-                for link in soup.find_all('a', href=True):
-                    href = link.get('href')
-                    if href.endswith(('.xls', '.xlsx')):
-                        all_xls_links.append(urljoin(self.base_url, href))
-                
-                # Look for the XLS link that appears after "Libro completo" in the HTML structure
-                soup_str = str(soup)
-                libro_completo_pos = soup_str.lower().find('libro completo')
-                
-                if libro_completo_pos != -1:
-                    # Look for XLS links after the "Libro completo" text
-                    remaining_html = soup_str[libro_completo_pos:]
-                    xls_match = re.search(r'href="([^"]*\.xls[^"]*)"', remaining_html, re.IGNORECASE)
-                    
-                    if xls_match:
-                        libro_completo_link = urljoin(self.base_url, xls_match.group(1))
-                        self.logger.info(f"Found Libro completo XLS: {libro_completo_link}")
-                
-                # Fallback: if we found XLS links but couldn't match the pattern, take the first one
-                if not libro_completo_link and all_xls_links:
-                    libro_completo_link = all_xls_links[0]
-                    self.logger.info(f"Using first XLS link as fallback: {libro_completo_link}")
+        except Exception as e:
+            self.logger.error(f"Error processing month page {month_url}: {e}")
+            return None
+    
+    def parse_month_page(self, month_url: str, content: bytes) -> Dict:
+        """
+        Extract the "Libro completo" XLS link and all Excel links from a month page
+        """
+        soup = BeautifulSoup(content, 'html.parser')
+        
+        # Look for "Libro completo" text and find XLS link near it
+        libro_completo_link = None
+        
+        # Method 1: Look for "Libro completo" text and find nearby XLS links
+        page_text = soup.get_text()
+        if 'libro completo' in page_text.lower():
+            # Find all XLS links on the page
+            all_xls_links = []
+            for link in soup.find_all('a', href=True):
+                href = link.get('href')
+                if href.endswith(('.xls', '.xlsx')):
+                    all_xls_links.append(urljoin(self.base_url, href))
             
-            # Method 2: Look for table structure with td elements (as backup)
-            if not libro_completo_link:
-                # Look for td elements containing "Libro completo" and adjacent td with XLS link
-                for td in soup.find_all('td'):
-                    if 'libro completo' in td.get_text().lower():
-                        # Look for sibling td elements with XLS links
-                        parent_row = td.find_parent('tr')
-                        if parent_row:
-                            for sibling_td in parent_row.find_all('td'):
-                                xls_link = sibling_td.find('a', href=re.compile(r'\.xls', re.IGNORECASE))
-                                if xls_link:
-                                    libro_completo_link = urljoin(self.base_url, xls_link.get('href'))
-                                    break
-                        if libro_completo_link:
-                            break
+            # Look for the XLS link that appears after "Libro completo" in the HTML structure
+            soup_str = str(soup)
+            libro_completo_pos = soup_str.lower().find('libro completo')
             
-            # Method 3: General XLS link search as final fallback
-            if not libro_completo_link:
-                excel_links = []
-                for link in soup.find_all('a', href=True):
-                    href = link.get('href')
-                    if href.endswith(('.xls', '.xlsx')):
-                        excel_links.append(urljoin(self.base_url, href))
+            if libro_completo_pos != -1:
+                # Look for XLS links after the "Libro completo" text
+                remaining_html = soup_str[libro_completo_pos:]
+                xls_match = re.search(r'href="([^"]*\.xls[^"]*)"', remaining_html, re.IGNORECASE)
                 
-                if excel_links:
-                    libro_completo_link = excel_links[0]
-                    self.logger.info(f"Using general XLS search fallback: {libro_completo_link}")
+                if xls_match:
+                    libro_completo_link = urljoin(self.base_url, xls_match.group(1))
+                    self.logger.info(f"Found Libro completo XLS: {libro_completo_link}")
             
-            return {
-                'url': month_url,
-                'libro_completo_url': libro_completo_link,
-                'all_excel_links': [urljoin(self.base_url, link.get('href')) 
-                                  for link in soup.find_all('a', href=True) 
-                                  if link.get('href', '').endswith(('.xls', '.xlsx'))]
-            }
+            # Fallback: if we found XLS links but couldn't match the pattern, take the first one
+            if not libro_completo_link and all_xls_links:
+                libro_completo_link = all_xls_links[0]
+                self.logger.info(f"Using first XLS link as fallback: {libro_completo_link}")
+        
+        # Method 2: Look for table structure with td elements (as backup)
+        if not libro_completo_link:
+            # Look for td elements containing "Libro completo" and adjacent td with XLS link
+            for td in soup.find_all('td'):
+                if 'libro completo' in td.get_text().lower():
+                    # Look for sibling td elements with XLS links
+                    parent_row = td.find_parent('tr')
+                    if parent_row:
+                        for sibling_td in parent_row.find_all('td'):
+                            xls_link = sibling_td.find('a', href=re.compile(r'\.xls', re.IGNORECASE))
+                            if xls_link:
+                                libro_completo_link = urljoin(self.base_url, xls_link.get('href'))
+                                break
+                    if libro_completo_link:
+                        break
+        
+        # Method 3: General XLS link search as final fallback
+        if not libro_completo_link:
+            excel_links = []
+            for link in soup.find_all('a', href=True):
+                href = link.get('href')
+                if href.endswith(('.xls', '.xlsx')):
+                    excel_links.append(urljoin(self.base_url, href))
             
-        except Exception as e:
-            self.logger.error(f"Error processing month page {month_url}: {e}")
-            return None
+            if excel_links:
+                libro_completo_link = excel_links[0]
+                self.logger.info(f"Using general XLS search fallback: {libro_completo_link}")
+        
+        return {
+            'url': month_url,
+            'libro_completo_url': libro_completo_link,
+            'all_excel_links': [urljoin(self.base_url, link.get('href')) 
+                              for link in soup.find_all('a', href=True) 
+                              if link.get('href', '').endswith(('.xls', '.xlsx'))]
+        }
     
     def download_excel_file(self, excel_url: str, filename: str = None) -> Optional[str]:
         """
@@ -301,6 +325,117 @@ class SepeScraper:
         self.logger.info(f"Downloaded {len(downloaded_files)} files")
         return downloaded_files
     
+    async def _fetch_with_retry_async(self, session: aiohttp.ClientSession, url: str, 
+                                      file_path: str = None, max_attempts: int = 3) -> Optional[bytes]:
+        """
+        GET a URL with exponential backoff between attempts (1s, 2s, 4s, ...)
+        
+        When file_path is given the body is streamed to that file and None is
+        returned; otherwise the body is returned as bytes.
+        """
+        for attempt in range(1, max_attempts + 1):
+            try:
+                async with session.get(url) as response:
+                    response.raise_for_status()
+                    if file_path is None:
+                        return await response.read()
+                    async with aiofiles.open(file_path, 'wb') as f:
+                        async for chunk in response.content.iter_chunked(65536):
+                            await f.write(chunk)
+                    return None
+            except (aiohttp.ClientError, asyncio.TimeoutError) as e:
+                if attempt == max_attempts:
+                    raise
+                delay = 2 ** (attempt - 1)
+                self.logger.warning(f"Attempt {attempt}/{max_attempts} for {url} failed ({e}), retrying in {delay}s")
+                await asyncio.sleep(delay)
+    
+    async def _download_excel_file_async(self, session: aiohttp.ClientSession, excel_url: str, filename: str) -> Optional[str]:
+        """
+        Download Excel file from SEPE without blocking the event loop
+        """
+        file_path = os.path.join(self.download_dir, filename)
+        
+        # Skip if file already exists
+        if os.path.exists(file_path):
+            self.logger.info(f"File already exists: {filename}")
+            return file_path
+        
+        try:
+            self.logger.info(f"Downloading: {excel_url}")
+            await self._fetch_with_retry_async(session, excel_url, file_path=file_path)
+            
+            self.logger.info(f"Downloaded: {filename}")
+            return file_path
+            
+        except Exception as e:
+            self.logger.error(f"Error downloading {excel_url}: {e}")
+            # Don't leave a partial file behind, it would be skipped as already downloaded
+            if os.path.exists(file_path):
+                os.remove(file_path)
+            return None
+    
+    async def _scrape_month_async(self, session: aiohttp.ClientSession, semaphore: asyncio.Semaphore,
+                                  year: str, month_info: Dict) -> Optional[str]:
+        """
+        Resolve the "Libro completo" link for one month page and download it
+        """
+        month_url = month_info['url']
+        month_identifier = month_info['month_identifier']
+        
+        async with semaphore:
+            self.logger.info(f"Processing: {year} - {month_identifier}")
+            try:
+                content = await self._fetch_with_retry_async(session, month_url)
+                month_data = self.parse_month_page(month_url, content)
+            except Exception as e:
+                self.logger.error(f"Error processing month page {month_url}: {e}")
+                return None
+            
+            if not month_data['libro_completo_url']:
+                self.logger.warning(f"No 'Libro completo' found for {year} - {month_identifier}")
+                return None
+            
+            # Download the complete book file with standardized naming
+            month_number = self.extract_month_number(month_identifier, year)
+            filename = f"{year}_{month_number:02d}_employment.xls"
+            return await self._download_excel_file_async(session, month_data['libro_completo_url'], filename)
+    
+    async def scrape_all_available_data_async(self, years: List[str] = None, max_files: int = None,
+                                              concurrency: int = 16) -> List[str]:
+        """
+        Scrape all available SEPE unemployment data with concurrent downloads
+        
+        Month pages and XLS files are fetched over a shared aiohttp session, with at
+        most `concurrency` months in flight and connections to the SEPE host capped
+        at the same number. Failed requests are retried with exponential backoff.
+        When max_files is set, only the first max_files months are requested.
+        """
+        year_month_data = self.get_available_years_months()
+        
+        # Filter by specified years if provided
+        if years:
+            year_month_data = {year: months for year, months in year_month_data.items() 
+                             if year in years}
+        
+        month_jobs = [(year, month_info) 
+                      for year, months in year_month_data.items() 
+                      for month_info in months]
+        if max_files:
+            month_jobs = month_jobs[:max_files]
+        
+        semaphore = asyncio.Semaphore(concurrency)
+        connector = aiohttp.TCPConnector(limit_per_host=concurrency)
+        async with aiohttp.ClientSession(headers=dict(self.session.headers), connector=connector) as session:
+            results = await asyncio.gather(
+                *(self._scrape_month_async(session, semaphore, year, month_info) 
+                  for year, month_info in month_jobs)
+            )
+        
+        downloaded_files = [file_path for file_path in results if file_path]
+        self.logger.info(f"Downloaded {len(downloaded_files)} files")
+        return downloaded_files
+    
     def get_latest_data(self) -> Optional[str]:
         """
         Get the most recent unemployment data file
@@ -0,0 +1,58 @@
+"""Round-trip tests for the SEPE parsed-sheet cache"""
+
+import numpy as np
+import pandas as pd
+
+from municipality_analytics.utils.sepe_data_cleaner import SEPE_COUNT_DTYPE, SepeDataCleaner
+
+
+def _parsed_province(province: str, count_columns: dict) -> pd.DataFrame:
+    """A frame shaped like SepeDataCleaner.parse_sheet output for an OLD-format sheet"""
+    rows = len(next(iter(count_columns.values())))
+    constant_codes = np.zeros(rows, dtype=np.int8)
+    df = pd.DataFrame({
+        'municipality_code': np.zeros(rows, dtype='int64'),
+        'municipality_name': [f"{province} {i}" for i in range(rows)],
+    })
+    for column, values in count_columns.items():
+        df[column] = pd.Series(values, dtype=SEPE_COUNT_DTYPE)
+    df['province'] = pd.Categorical.from_codes(constant_codes, categories=[province])
+    df['year'] = np.int16(2006)
+    df['month'] = np.int8(5)
+    df['data_type'] = pd.Categorical.from_codes(constant_codes, categories=['unemployment'])
+    return df
+
+
+def test_parse_cache_round_trip_with_different_column_sets(tmp_path):
+    input_dir = tmp_path / "raw"
+    input_dir.mkdir()
+    xls_path = input_dir / "2006_05_employment.xls"
+    xls_path.write_bytes(b"")
+    cleaner = SepeDataCleaner(input_dir=str(input_dir), output_dir=str(tmp_path / "clean"), excel_engine=None)
+    
+    # The second province's sheet was short and lacks men_45_plus
+    results = {
+        'unemployment': {
+            'MADRID': _parsed_province('MADRID', {'total_unemployment': [10, 20], 'men_45_plus': [1, 2]}),
+            'SORIA': _parsed_province('SORIA', {'total_unemployment': [3]}),
+        },
+        'contracts': {},
+    }
+    cleaner.save_parse_cache(xls_path, results)
+    cached = cleaner.load_parse_cache(xls_path)
+    
+    assert cached is not None
+    assert set(cached['unemployment']) == {'MADRID', 'SORIA'}
+    assert cached['contracts'] == {}
+    soria = cached['unemployment']['SORIA']
+    assert 'men_45_plus' not in soria.columns
+    assert soria['total_unemployment'].dtype == SEPE_COUNT_DTYPE
+    madrid = cached['unemployment']['MADRID']
+    assert madrid['men_45_plus'].tolist() == [1, 2]
+    assert madrid['men_45_plus'].dtype == SEPE_COUNT_DTYPE
+    
+    # A cache hit must consolidate like a fresh parse does
+    saved = cleaner.save_consolidated_data('unemployment', cached['unemployment'], 2006, 5)
+    consolidated = pd.read_parquet(saved)
+    assert len(consolidated) == 3
+    assert consolidated['total_unemployment'].tolist() == [10, 20, 3]
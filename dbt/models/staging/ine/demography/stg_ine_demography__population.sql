@@ -5,7 +5,21 @@
   )
 }}
 
-with source_data as (
+with raw_rows as (
+    select *
+    from {{ source('raw', 'raw_demography_population') }}
+    
+    -- Drop subtotal/aggregate rows (e.g. "Total Nacional") before codes are cast.
+    -- The label can sit in any code or name column depending on the year's layout;
+    -- names only match whole words (whitespace-delimited, independent of the database locale)
+    -- so municipalities like Totalán or Sumacàrcer are kept
+    where coalesce(province_code::text, '') !~* 'total|suma|agregado'
+      and coalesce(cmun::text, '') !~* 'total|suma|agregado'
+      and coalesce(province_name, '') !~* '(^|\s)(total|suma|agregado)(\s|$)'
+      and coalesce(municipality_name, '') !~* '(^|\s)(total|suma|agregado)(\s|$)'
+),
+
+source_data as (
     select 
         -- Geographic identifiers (converted to integers to match codes_data)
         province_code::numeric::integer as province_code,
@@ -35,7 +49,7 @@ with source_data as (
         data_source,
         ingestion_timestamp
         
-    from {{ source('raw', 'raw_demography_population') }}
+    from raw_rows
     
     -- Basic data quality filters
     where municipality_name is not null
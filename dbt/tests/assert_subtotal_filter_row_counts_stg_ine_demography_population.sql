@@ -0,0 +1,46 @@
+{{ config(severity = 'warn') }}
+
+-- Singular test comparing raw vs staging row counts for the subtotal filter
+-- Expected: per year, only aggregate rows are removed (a national total plus at most
+-- one total per province, ~60 rows); more suggests real municipalities are being dropped
+
+with raw_counts as (
+    select
+        data_year,
+        count(*) as raw_records
+    from {{ source('raw', 'raw_demography_population') }}
+    group by data_year
+),
+
+subtotal_counts as (
+    select
+        data_year,
+        count(*) as subtotal_records
+    from {{ source('raw', 'raw_demography_population') }}
+    where coalesce(province_code::text, '') ~* 'total|suma|agregado'
+       or coalesce(cmun::text, '') ~* 'total|suma|agregado'
+       or coalesce(province_name, '') ~* '(^|\s)(total|suma|agregado)(\s|$)'
+       or coalesce(municipality_name, '') ~* '(^|\s)(total|suma|agregado)(\s|$)'
+    group by data_year
+),
+
+staging_counts as (
+    select
+        data_year,
+        count(*) as staging_records
+    from {{ ref('stg_ine_demography__population') }}
+    group by data_year
+)
+
+-- Return years where the filter removed suspiciously many rows - if this query returns rows, the test warns
+select
+    rc.data_year,
+    rc.raw_records,
+    sc.subtotal_records,
+    coalesce(stg.staging_records, 0) as staging_records,
+    'Year ' || rc.data_year || ' drops ' || sc.subtotal_records || ' subtotal rows of ' || rc.raw_records as warning_message
+from raw_counts rc
+join subtotal_counts sc on sc.data_year = rc.data_year
+left join staging_counts stg on stg.data_year = rc.data_year
+where sc.subtotal_records > 60
+order by rc.data_year
@@ -6,6 +6,8 @@
 DBT_PROJECT_DIR="/app/dbt"
 TRIGGER_FILE="$DBT_PROJECT_DIR/run_dbt_build.trigger"
 RESULT_FILE="$DBT_PROJECT_DIR/dbt_build_result.txt"
+# Manifest of the last successful build, compared against for state:modified selection
+STATE_DIR="$DBT_PROJECT_DIR/state"
 
 echo "Starting dbt trigger watcher..."
 echo "Watching for trigger file: $TRIGGER_FILE"
@@ -17,8 +19,20 @@ while true; do
         # Change to dbt project directory
         cd "$DBT_PROJECT_DIR"
         
+        # Build options requested by Dagster (threads=N, select=all|state:modified+)
+        THREADS=$(sed -n 's/^threads=//p' "$TRIGGER_FILE")
+        SELECT=$(sed -n 's/^select=//p' "$TRIGGER_FILE")
+        DBT_ARGS="--threads ${THREADS:-8}"
+        if [ "$SELECT" = "state:modified+" ] && [ -f "$STATE_DIR/manifest.json" ]; then
+            DBT_ARGS="$DBT_ARGS --select state:modified+ --state $STATE_DIR"
+        fi
+        echo "Running: dbt build $DBT_ARGS"
+        
         # Run dbt build and capture result
-        if dbt build > /tmp/dbt_output.log 2>&1; then
+        if dbt build $DBT_ARGS > /tmp/dbt_output.log 2>&1; then
+            # Keep this build's manifest as the baseline for the next state:modified run
+            mkdir -p "$STATE_DIR"
+            cp target/manifest.json "$STATE_DIR/manifest.json"
             echo "SUCCESS: dbt build completed successfully" > "$RESULT_FILE"
             echo "--- dbt output ---" >> "$RESULT_FILE"
             cat /tmp/dbt_output.log >> "$RESULT_FILE"